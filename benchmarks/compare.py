@@ -0,0 +1,69 @@
+"""
+Compare two benchmark result files and report regressions.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json --threshold 0.1
+
+Exits with status 1 if any metric regressed by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is an improvement; all other measured metrics are better when smaller
+higher_is_better = {"throughput_items_per_s"}
+
+# Metrics that describe the workload rather than its performance
+informational = {"input_mb", "num_chunks", "num_texts", "items", "calls", "failures"}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Compare the results of two benchmark runs.
+
+    :param baseline: The baseline results, as written by benchmarks.run.
+    :param current: The current results, as written by benchmarks.run.
+    :param threshold: The relative change above which a metric counts as a regression, e.g. 0.1 for 10%.
+    :return: A list of (case, metric, baseline, current, change, regressed) tuples.
+    """
+    rows = []
+    for case, metrics in current["results"].items():
+        baseline_metrics = baseline["results"].get(case, {})
+        for metric, value in metrics.items():
+            baseline_value = baseline_metrics.get(metric)
+            if metric in informational or value is None or not baseline_value:
+                continue
+
+            change = (value - baseline_value) / abs(baseline_value)
+            regression = -change if metric in higher_is_better else change
+            rows.append((case, metric, baseline_value, value, change, regression > threshold))
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if baseline.get("config") != current.get("config"):
+        print("Warning: the runs used different configs, so the results may not be comparable.", file=sys.stderr)
+
+    rows = compare(baseline, current, args.threshold)
+    for case, metric, baseline_value, value, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{case:<22} {metric:<24} {baseline_value:>14.6g} {value:>14.6g} {change:>+9.1%} {flag}")
+
+    if any(regressed for *_, regressed in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
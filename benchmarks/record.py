@@ -0,0 +1,65 @@
+"""
+Record a 10-K or 10-Q filing, or a PDF, from the network into a benchmark fixture.
+
+Usage:
+    python -m benchmarks.record 10-K --ticker TSLA --year 2023 --output benchmarks/fixtures/10k.json.gz
+    python -m benchmarks.record 10-Q --ticker TSLA --year 2023 --quarter 4 --output benchmarks/fixtures/10q.json.gz
+    python -m benchmarks.record pdf --url https://www.berkshirehathaway.com/letters/2023ltr.pdf --output benchmarks/fixtures/letter.pdf
+
+Filings are stored as their raw HTML document, so that the benchmarks include edgar's parsing, and
+as the items edgar extracts from it before cleaning, so that they include the cleaning step.
+"""
+import argparse
+import gzip
+import json
+
+import requests
+
+from financial_datasets.parser import FilingParser, default_sec_identity
+
+
+def record_filing(form: str, ticker: str, year: int, quarter: int, sec_identity: str) -> dict:
+    parser = FilingParser()
+    if form == "10-K":
+        filing = parser.get_10K_filing(ticker, year, sec_identity)
+    else:
+        filing = parser.get_10Q_filing(ticker, year, quarter, sec_identity)
+
+    report = filing.obj()
+    return {
+        "form": form,
+        "company": filing.company,
+        "ticker": ticker,
+        "cik": filing.cik,
+        "report_date": str(filing.report_date),
+        "accession_number": filing.accession_number,
+        "items": {item: report[item] for item in report.items},
+        "html": filing.html(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", choices=["10-K", "10-Q", "pdf"])
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--ticker")
+    parser.add_argument("--year", type=int)
+    parser.add_argument("--quarter", type=int)
+    parser.add_argument("--url")
+    parser.add_argument("--sec-identity", default=default_sec_identity)
+    args = parser.parse_args(argv)
+
+    if args.source == "pdf":
+        response = requests.get(args.url)
+        response.raise_for_status()
+        with open(args.output, "wb") as f:
+            f.write(response.content)
+        return
+
+    fixture = record_filing(args.source, args.ticker, args.year, args.quarter, args.sec_identity)
+    with gzip.open(args.output, "wt", compresslevel=9) as f:
+        json.dump(fixture, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+Benchmark the dataset generation paths against recorded fixtures and a stub LLM.
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --latency 0.2 --failure-rate 0.1 --scale 10 --output results.json
+
+Each case runs in a fresh process so that its peak RSS is measured in isolation. Compare two
+result files with `python -m benchmarks.compare`.
+
+The parser cases parse the recorded HTML document of the filing with edgar, so parse_s_per_mb
+covers edgar's item extraction, and every per-MB metric is relative to the size of that document.
+Chunking and token counting use tiktoken, whose encodings are downloaded into the tiktoken cache
+on the first run; after that no network access is needed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+from types import SimpleNamespace
+from unittest import mock
+
+# The OpenAI client is created when financial_datasets.llm.openai is imported, but is never called
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_text_splitters import TokenTextSplitter  # noqa: E402
+from PyPDF2 import PdfReader  # noqa: E402
+
+from benchmarks.stubs import (  # noqa: E402
+    FixtureEdgar,
+    StubLLM,
+    load_filing_fixture,
+    load_pdf_fixture,
+    warm_tiktoken_cache,
+)
+from financial_datasets.generator import DatasetGenerator  # noqa: E402
+from financial_datasets.parser import FilingParser  # noqa: E402
+
+default_config = {
+    "max_questions": 50,
+    "latency": 0.0,
+    "failure_rate": 0.0,
+    "yield_rate": 1.0,
+    "scale": 1,
+    "chunk_size": 1024,
+    "chunk_overlap": 100,
+    "seed": 0,
+}
+
+
+def mb(texts) -> float:
+    return sum(len(text.encode("utf-8")) for text in texts) / 1e6
+
+
+def patch_edgar(fixtures):
+    edgar = FixtureEdgar(fixtures)
+    return mock.patch.multiple(
+        "financial_datasets.parser",
+        Company=edgar.Company,
+        get_filings=edgar.get_filings,
+        set_identity=edgar.set_identity,
+    )
+
+
+def patch_llm(config) -> tuple:
+    llm = StubLLM(
+        latency=config["latency"],
+        failure_rate=config["failure_rate"],
+        yield_rate=config["yield_rate"],
+        seed=config["seed"],
+    )
+    return llm, mock.patch("financial_datasets.generator.chat_completion_request", llm)
+
+
+def generation_metrics(llm: StubLLM, num_items: int, wall_s: float) -> dict:
+    return {
+        "items": num_items,
+        "calls": llm.calls,
+        "failures": llm.failures,
+        "wall_s": wall_s,
+        "throughput_items_per_s": num_items / wall_s if wall_s else 0.0,
+        "time_to_first_item_s": llm.time_to_first_item,
+        "calls_per_item": llm.calls / num_items if num_items else None,
+        "tokens_per_question": (llm.input_tokens + llm.output_tokens) / num_items if num_items else None,
+    }
+
+
+def split(texts, config):
+    token_splitter = TokenTextSplitter(chunk_size=config["chunk_size"], chunk_overlap=config["chunk_overlap"])
+    chunks = []
+    for text in texts:
+        chunks.extend(token_splitter.split_text(text))
+    return chunks
+
+
+def bench_parser(config, fixture_name: str) -> dict:
+    fixture = load_filing_fixture(fixture_name, scale=config["scale"])
+    parser = FilingParser()
+
+    with patch_edgar([fixture]):
+        if fixture["form"] == "10-K":
+            filing = parser.get_10K_filing(fixture["ticker"], int(fixture["report_date"][:4]))
+        else:
+            filing = parser.get_10Q_filing(fixture["ticker"], int(fixture["report_date"][:4]), 1)
+
+    # Parse the recorded HTML document with edgar and clean the items, the way get_10K_items does
+    start = time.perf_counter()
+    items = parser.get_items(filing)
+    total_s = time.perf_counter() - start
+
+    # Time the cleaning on its own, on the items as edgar extracted them
+    report = filing.obj()
+    raw_items = [report[item] for item in report.items]
+    start = time.perf_counter()
+    parser._clean_items(raw_items)
+    clean_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = split(items, config)
+    chunk_s = time.perf_counter() - start
+
+    input_mb = mb([fixture["html"]])
+    return {
+        "input_mb": input_mb,
+        "num_chunks": len(chunks),
+        "parse_s_per_mb": max(total_s - clean_s, 0.0) / input_mb,
+        "clean_s_per_mb": clean_s / input_mb,
+        "chunk_s_per_mb": chunk_s / input_mb,
+    }
+
+
+def bench_parser_10K(config) -> dict:
+    return bench_parser(config, "10k.json.gz")
+
+
+def bench_parser_10Q(config) -> dict:
+    return bench_parser(config, "10q.json.gz")
+
+
+def bench_generate_from_texts(config) -> dict:
+    fixture = load_filing_fixture("10k.json.gz", scale=config["scale"])
+    texts = split(FilingParser()._clean_items(list(fixture["items"].values())), config)
+    generator = DatasetGenerator(model="gpt-4-turbo", api_key="benchmark")
+
+    llm, patch = patch_llm(config)
+    with patch:
+        llm.reset()
+        start = time.perf_counter()
+        dataset = generator.generate_from_texts(texts, max_questions=config["max_questions"], request_interval=0)
+        wall_s = time.perf_counter() - start
+
+    return {"num_texts": len(texts), **generation_metrics(llm, len(dataset.items), wall_s)}
+
+
+def bench_generate_from_10K(config) -> dict:
+    fixture = load_filing_fixture("10k.json.gz", scale=config["scale"])
+    generator = DatasetGenerator(model="gpt-4-turbo", api_key="benchmark")
+
+    llm, patch = patch_llm(config)
+    with patch_edgar([fixture]), patch:
+        llm.reset()
+        start = time.perf_counter()
+        dataset = generator.generate_from_10K(
+            ticker=fixture["ticker"],
+            year=int(fixture["report_date"][:4]),
+            max_questions=config["max_questions"],
+            chunk_size=config["chunk_size"],
+            chunk_overlap=config["chunk_overlap"],
+            request_interval=0,
+        )
+        wall_s = time.perf_counter() - start
+
+    return {"input_mb": mb([fixture["html"]]), **generation_metrics(llm, len(dataset.items), wall_s)}
+
+
+def bench_generate_from_pdf(config) -> dict:
+    content = load_pdf_fixture()
+    input_mb = len(content) / 1e6
+
+    # Time the extraction on its own, the way generate_from_pdf does it
+    start = time.perf_counter()
+    reader = PdfReader(BytesIO(content))
+    text = "".join(page.extract_text() for page in reader.pages)
+    extract_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    split([text.replace("\n", " ")], config)
+    chunk_s = time.perf_counter() - start
+
+    generator = DatasetGenerator(model="gpt-4-turbo", api_key="benchmark")
+    llm, patch = patch_llm(config)
+    with mock.patch("financial_datasets.generator.requests.get", return_value=SimpleNamespace(content=content)), patch:
+        llm.reset()
+        start = time.perf_counter()
+        dataset = generator.generate_from_pdf(
+            url="https://example.com/letter.pdf",
+            max_questions=config["max_questions"],
+            chunk_size=config["chunk_size"],
+            chunk_overlap=config["chunk_overlap"],
+            request_interval=0,
+        )
+        wall_s = time.perf_counter() - start
+
+    return {
+        "input_mb": input_mb,
+        "extract_s_per_mb": extract_s / input_mb,
+        "chunk_s_per_mb": chunk_s / input_mb,
+        **generation_metrics(llm, len(dataset.items), wall_s),
+    }
+
+
+cases = {
+    "parser_10K": bench_parser_10K,
+    "parser_10Q": bench_parser_10Q,
+    "generate_from_texts": bench_generate_from_texts,
+    "generate_from_10K": bench_generate_from_10K,
+    "generate_from_pdf": bench_generate_from_pdf,
+}
+
+
+def run_case(name: str, config: dict) -> dict:
+    result = cases[name](config)
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mb"] = max_rss / 1e6 if sys.platform == "darwin" else max_rss / 1e3
+    return result
+
+
+def median_result(results: list) -> dict:
+    merged = {}
+    for metric in results[0]:
+        values = [result[metric] for result in results if result[metric] is not None]
+        merged[metric] = statistics.median(values) if values else None
+    return merged
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=sorted(cases), default=list(cases))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median of each metric is reported.")
+    parser.add_argument("--output", help="File to write the JSON results to. Defaults to stdout.")
+    for key, value in default_config.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+
+    config = {key: getattr(args, key) for key in default_config}
+    context = multiprocessing.get_context("spawn")
+
+    # Chunking and token counting need tiktoken encodings, which are downloaded on first use
+    warm_tiktoken_cache()
+
+    results = {}
+    for name in args.cases:
+        runs = []
+        for _ in range(args.repeat):
+            with context.Pool(1) as pool:
+                runs.append(pool.apply(run_case, (name, config)))
+        results[name] = median_result(runs)
+        print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    output = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "config": config,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
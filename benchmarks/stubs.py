@@ -0,0 +1,219 @@
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+from edgar.company_reports import TenK, TenQ
+
+fixtures_dir = os.path.join(os.path.dirname(__file__), "fixtures")
+
+sentence_pattern = re.compile(r"[^.!?]*\d[^.!?]*[.!?]")
+number_pattern = re.compile(r"\$?\d[\d,]*(?:\.\d+)?%?(?: (?:billion|million))?")
+requested_pattern = re.compile(r"Generate (\d+) questions")
+
+
+# The tiktoken encodings used by TokenTextSplitter and by the stub LLM's token counts
+tiktoken_encodings = ("gpt2", "cl100k_base")
+
+
+def load_filing_fixture(name: str, scale: int = 1) -> dict:
+    """
+    Load a recorded filing fixture, optionally repeating its content to make the filing larger.
+
+    :param name: The fixture file name, e.g. "10k.json.gz".
+    :param scale: How many times to repeat the text of each item and the body of the document.
+    :return: The fixture, with form, company, ticker, cik, report_date, accession_number, items and html.
+    """
+    with gzip.open(os.path.join(fixtures_dir, name), "rt") as f:
+        fixture = json.load(f)
+
+    fixture["items"] = {name: "\n".join([text] * scale) for name, text in fixture["items"].items()}
+    fixture["html"] = scale_html(fixture["html"], scale)
+    return fixture
+
+
+def scale_html(html: str, scale: int) -> str:
+    """
+    Repeat the body of an HTML document. Repeating the whole document would not work, since
+    parsing stops at the first closing html tag.
+
+    :param html: The HTML document.
+    :param scale: How many times to repeat the body.
+    :return: The larger HTML document.
+    """
+    lower = html.lower()
+    start = html.index(">", lower.index("<body")) + 1
+    end = lower.rindex("</body>")
+    return html[:start] + html[start:end] * scale + html[end:]
+
+
+def load_pdf_fixture(name: str = "letter.pdf") -> bytes:
+    with open(os.path.join(fixtures_dir, name), "rb") as f:
+        return f.read()
+
+
+def tiktoken_counter() -> Callable[[str], int]:
+    import tiktoken
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
+
+
+def warm_tiktoken_cache():
+    """
+    Load the tiktoken encodings the benchmarks use, downloading them into the tiktoken cache
+    (TIKTOKEN_CACHE_DIR) if they are not there yet, so that a missing cache fails fast.
+    """
+    import tiktoken
+
+    for name in tiktoken_encodings:
+        try:
+            tiktoken.get_encoding(name)
+        except Exception as e:
+            raise RuntimeError(
+                f"Could not load the tiktoken encoding {name}. Run the benchmarks once with network access, "
+                f"or point TIKTOKEN_CACHE_DIR at a cache that already has it."
+            ) from e
+
+
+class StubLLM:
+    """
+    Stand-in for chat_completion_request that answers from the prompt text instead of calling OpenAI.
+
+    Each call sleeps for `latency` seconds, fails with probability `failure_rate` (returning the
+    exception, like chat_completion_request does after its retries), and otherwise returns
+    `yield_rate` of the questions that were asked for, built from numeric sentences in the text.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        yield_rate: float = 1.0,
+        seed: int = 0,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.yield_rate = yield_rate
+        self.count_tokens = count_tokens or tiktoken_counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.failures = 0
+        self.items = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.started_at = time.perf_counter()
+        self.first_item_at: Optional[float] = None
+
+    @property
+    def time_to_first_item(self) -> Optional[float]:
+        if self.first_item_at is None:
+            return None
+        return self.first_item_at - self.started_at
+
+    def __call__(self, model: str, messages, tools=None, tool_choice=None):
+        time.sleep(self.latency)
+
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.failure_rate:
+                self.failures += 1
+                return RuntimeError("Stub LLM failure")
+
+        prompt = "".join(message["content"] for message in messages)
+        text = messages[-1]["content"]
+        requested = int(requested_pattern.search(text).group(1))
+        dataset_items = self._dataset_items(text, round(requested * self.yield_rate))
+        arguments = json.dumps({"dataset_items": dataset_items})
+
+        input_tokens = self.count_tokens(prompt)
+        output_tokens = self.count_tokens(arguments)
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.items += len(dataset_items)
+            if dataset_items and self.first_item_at is None:
+                self.first_item_at = time.perf_counter()
+
+        tool_call = SimpleNamespace(function=SimpleNamespace(name="generate_dataset", arguments=arguments))
+        return SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=input_tokens, completion_tokens=output_tokens),
+            choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[tool_call]))],
+        )
+
+    def _dataset_items(self, text: str, num_items: int) -> List[dict]:
+        sentences = [sentence.strip() for sentence in sentence_pattern.findall(text)]
+        items = []
+        for sentence in sentences[:num_items]:
+            answer = number_pattern.search(sentence).group(0)
+            items.append({
+                "question": f"What figure is reported in: {sentence[:80]}?",
+                "answer": answer,
+                "context": sentence,
+            })
+        return items
+
+
+class FixtureFiling:
+    """
+    Stand-in for an edgar EntityFiling backed by a recorded fixture.
+
+    obj() returns a real edgar TenK or TenQ, so reading its items parses the recorded HTML
+    document the same way a downloaded filing is parsed.
+    """
+
+    def __init__(self, fixture: dict):
+        self.form = fixture["form"]
+        self.company = fixture["company"]
+        self.cik = fixture["cik"]
+        self.report_date = fixture["report_date"]
+        self.accession_number = fixture["accession_number"]
+        self._fixture = fixture
+
+    def html(self) -> str:
+        return self._fixture["html"]
+
+    def obj(self):
+        return TenK(self) if self.form == "10-K" else TenQ(self)
+
+
+class FixtureEdgar:
+    """
+    Replaces the edgar Company, get_filings and set_identity used by FilingParser so that
+    every filing lookup is answered from the given fixtures.
+    """
+
+    def __init__(self, fixtures: List[dict]):
+        self._filings = [FixtureFiling(fixture) for fixture in fixtures]
+
+    def set_identity(self, identity: str):
+        pass
+
+    def get_filings(self, year: int, quarter: int, form: str) -> List[FixtureFiling]:
+        return [filing for filing in self._filings if filing.form == form]
+
+    def Company(self, ticker: str):
+        filings = self._filings
+
+        class FixtureCompany:
+            cik = filings[0].cik
+
+            def get_filings(self, form: str = None, accession_number: str = None) -> List[FixtureFiling]:
+                return [
+                    filing for filing in filings
+                    if (form is None or filing.form == form)
+                    and (accession_number is None or filing.accession_number == accession_number)
+                ]
+
+        return FixtureCompany()
@@ -0,0 +1,190 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+from edgar.financials import Financials, FactRow, HeaderRow
+
+statement_titles = {
+    "income_statement": "Income Statement",
+    "balance_sheet": "Balance Sheet",
+    "cash_flow_statement": "Cash Flow Statement",
+}
+
+
+class FilingFinancials:
+    """
+    Structured financial data extracted from the XBRL of a 10-K or 10-Q filing.
+
+    `facts` has one row per numeric, non-dimensional XBRL fact with the columns
+    namespace, fact, value (float), units, start_date and end_date (datetime).
+
+    `statements` maps "income_statement", "balance_sheet" and "cash_flow_statement" to a
+    DataFrame indexed by fact name, with a label column, a units column and one float
+    column per period end date, most recent first.
+    """
+
+    def __init__(
+        self,
+        company: str,
+        form: str,
+        facts: pd.DataFrame,
+        statements: Dict[str, pd.DataFrame],
+    ):
+        self.company = company
+        self.form = form
+        self.facts = facts
+        self.statements = statements
+
+    @classmethod
+    def from_xbrl(cls, xbrl, form: str, company: Optional[str] = None) -> "FilingFinancials":
+        """
+        Create the financials from a parsed edgar FilingXbrl.
+
+        :param xbrl: The FilingXbrl of the filing.
+        :param form: The form of the filing, e.g. "10-K".
+        :param company: The company name. Defaults to the registrant name in the XBRL.
+        :return: The financials of the filing.
+        """
+        facts = xbrl.facts.data
+        facts = facts[facts["dimensions"].isnull()]
+        facts = (
+            pd.DataFrame({
+                "namespace": facts["namespace"].astype("string"),
+                "fact": facts["fact"].astype("string"),
+                "value": pd.to_numeric(facts["value"], errors="coerce"),
+                "units": facts["units"].astype("string"),
+                "start_date": pd.to_datetime(facts["start_date"], errors="coerce"),
+                "end_date": pd.to_datetime(facts["end_date"], errors="coerce"),
+            })
+            .dropna(subset=["value"])
+            .reset_index(drop=True)
+        )
+
+        # Units are not part of the statement tables, so look them up from the facts
+        units = facts.drop_duplicates(subset=["fact"]).set_index("fact")["units"]
+
+        financials = Financials.from_xbrl(xbrl)
+        statements = {}
+        for name in statement_titles:
+            fact_table = getattr(financials, name)
+            table = fact_table.to_dataframe()
+            periods = [column for column in table.columns if column != "Label"]
+            labels = fact_labels(fact_table.mapping)
+
+            statement = pd.DataFrame(index=table.index.astype(str))
+            statement.index.name = "fact"
+            statement["label"] = [labels.get(fact, label) for fact, label in zip(statement.index, table["Label"])]
+            statement["label"] = statement["label"].astype("string")
+            statement["units"] = units.reindex(statement.index).astype("string")
+            for period in periods:
+                statement[str(period)] = pd.to_numeric(table[period], errors="coerce").astype("float64")
+
+            # Drop the rows that have no value for any period, such as unused alternate facts
+            statement = statement.dropna(subset=[str(period) for period in periods], how="all")
+            statements[name] = statement[~statement.index.duplicated()]
+
+        return cls(
+            company=company or xbrl.company_name,
+            form=form,
+            facts=facts,
+            statements=statements,
+        )
+
+    @property
+    def periods(self) -> List[str]:
+        """The period end dates covered by the statements, most recent first."""
+        periods = set()
+        for statement in self.statements.values():
+            periods.update(period_columns(statement))
+        return sorted(periods, reverse=True)
+
+    def to_texts(self) -> List[str]:
+        """
+        Serialize each statement as a compact table, one text per statement.
+
+        :return: A list of texts that can be passed to the dataset generator.
+        """
+        texts = []
+        for name, statement in self.statements.items():
+            if statement.empty:
+                continue
+
+            lines = self.statement_header(name)
+            for fact in statement.index:
+                lines.append(self.statement_row(name, fact))
+
+            texts.append("\n".join(lines))
+
+        return texts
+
+    def statement_header(self, name: str) -> List[str]:
+        """
+        Get the title and column lines that a statement starts with in to_texts.
+
+        :param name: The statement name, e.g. "income_statement".
+        :return: The title line and the column line.
+        """
+        statement = self.statements[name]
+        units = ", ".join(sorted(set(statement["units"].dropna())))
+        return [
+            f"{self.company} {statement_titles[name]} ({self.form}, {units})",
+            " | ".join(["Line item"] + period_columns(statement)),
+        ]
+
+    def statement_row(self, name: str, fact: str) -> str:
+        """
+        Get the line of a fact in a statement as it appears in to_texts.
+
+        :param name: The statement name, e.g. "income_statement".
+        :param fact: The fact name, e.g. "Revenues".
+        :return: The line, e.g. "Revenue | 96,773,000,000 | 81,462,000,000".
+        """
+        statement = self.statements[name]
+        row = statement.loc[fact]
+        values = [format_value(row[period]) for period in period_columns(statement)]
+        return " | ".join([row["label"]] + values)
+
+
+def period_columns(statement: pd.DataFrame) -> List[str]:
+    """
+    Get the period columns of a statement, most recent first.
+
+    :param statement: A statement from FilingFinancials.statements.
+    :return: The period end dates of the statement.
+    """
+    return [column for column in statement.columns if column not in ("label", "units")]
+
+
+def fact_labels(mapping: list) -> Dict[str, str]:
+    """
+    Get a standalone label for each fact in an edgar statement mapping.
+
+    Indented one-word labels like "Basic" only make sense under their header, so they are
+    prefixed with it, e.g. "Earnings Per Share Basic".
+
+    :param mapping: The mapping of an edgar FactTable.
+    :return: A dict of fact name to label.
+    """
+    labels = {}
+    header = ""
+    for row in mapping:
+        if isinstance(row, HeaderRow):
+            header = row.label
+            continue
+
+        for fact_row in row if isinstance(row, list) else [row]:
+            if not isinstance(fact_row, FactRow):
+                continue
+            label = fact_row.label.strip()
+            if fact_row.label.startswith("\t") and len(label.split()) == 1 and header:
+                label = f"{header} {label}"
+            labels[fact_row.name] = label
+
+    return labels
+
+
+def format_value(value: float) -> str:
+    if pd.isna(value):
+        return ""
+    if float(value).is_integer():
+        return f"{value:,.0f}"
+    return f"{value:,.2f}"
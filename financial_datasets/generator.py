@@ -1,7 +1,7 @@
 import json
 import time
 from io import BytesIO
-from typing import List
+from typing import List, Optional
 
 import requests
 from PyPDF2 import PdfReader
@@ -9,16 +9,18 @@ from langchain_text_splitters import TokenTextSplitter
 from tqdm import tqdm
 
 from financial_datasets.dataset import DatasetItem, Dataset
+from financial_datasets.index import ChunkIndex
 from financial_datasets.llm.openai import chat_completion_request
 from financial_datasets.parser import FilingParser
 from financial_datasets.prompts import default_prompt
+from financial_datasets.scheduler import ChunkScheduler
 from financial_datasets.tools import generate_dataset
 
 default_sec_identity = "gary gary@financialdatasets.org"
 
 
 class DatasetGenerator:
-    def __init__(self, model: str, api_key: str):
+    def __init__(self, model: str, api_key: str, index: Optional[ChunkIndex] = None):
         # Ensure model begins with gpt-
         if not model.startswith('gpt-'):
             raise NotImplementedError(f'Model {model} is not supported yet.')
@@ -28,6 +30,9 @@ class DatasetGenerator:
 
         self._model = model
 
+        # Optional index that chunks from filings and PDFs are added to, for use by generate_from_query
+        self._index = index
+
     def generate_from_texts(
         self,
         texts: List[str],
@@ -37,8 +42,12 @@ class DatasetGenerator:
         """
         Generate questions from a list of texts.
 
+        Texts are scored by their expected question yield and dispatched best first, with
+        questions that a text fails to deliver reallocated to the texts that follow.
+
         :param texts: List of texts to generate questions from.
         :param max_questions: Maximum number of questions to generate.
+        :param kwargs: Additional arguments like system_prompt, request_interval, weights, etc.
 
         :return: Dataset containing the generated questions.
         """
@@ -46,12 +55,12 @@ class DatasetGenerator:
         # Get optional system prompt from kwargs
         system_prompt = kwargs.get("system_prompt", default_prompt)
 
-        # Determine how many questions to generate per text
-        num_texts = len(texts)
-        questions_per_text = max_questions // num_texts
+        # Get optional number of seconds to wait between LLM requests from kwargs
+        request_interval = kwargs.get("request_interval", 1)
 
-        # Keep track of remaining questions to generate
-        num_remaining_questions = max_questions % num_texts
+        # Score the texts and decide how many questions to ask for from each, best texts first
+        # Optional weights, e.g. retrieval similarities, scale each text's score
+        scheduler = ChunkScheduler(texts, max_questions, weights=kwargs.get("weights"))
 
         # Keep track of usage
         input_tokens = 0
@@ -61,13 +70,10 @@ class DatasetGenerator:
 
         # Generate dataset items
         items: List[DatasetItem] = []
-        for index, text in enumerate(texts):
+        for index, current_max_questions in scheduler:
+            text = texts[index]
+            num_generated = 0
             try:
-                # Determine the number of questions to generate for the current text
-                current_max_questions = questions_per_text
-                if index < num_remaining_questions:
-                    current_max_questions += 1
-
                 # Generate questions
                 response = chat_completion_request(
                     model=self._model,
@@ -96,6 +102,7 @@ class DatasetGenerator:
 
                     # Convert the dataset_items (list of dicts) to list of DatasetItem
                     dataset_items = [DatasetItem(**item) for item in dataset_items]
+                    num_generated = len(dataset_items)
 
                     # Add the generated items to our total list of questions
                     items.extend(dataset_items)
@@ -111,8 +118,12 @@ class DatasetGenerator:
                 print(f"Failed to generate questions for batch {index + 1}: {e}")
                 continue
 
-            # Sleep for 1 second to avoid overloading the LLM
-            time.sleep(1)
+            finally:
+                # Let the scheduler reallocate any questions this text did not deliver
+                scheduler.record(num_generated)
+
+            # Sleep between requests to avoid overloading the LLM
+            time.sleep(request_interval)
 
         # Ensure the progress bar is closed
         progress_bar.close()
@@ -135,33 +146,12 @@ class DatasetGenerator:
         :param kwargs: Additional arguments like chunk_size, chunk_overlap, etc.
         :return: Dataset containing the generated questions.
         """
-        # Download the PDF file
-        response = requests.get(url)
-        pdf_file = BytesIO(response.content)
+        texts = self._chunk_pdf(url, **kwargs)
 
-        # Extract text from the PDF file
-        reader = PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
+        # Cache the chunks so that they can be retrieved by later queries
+        self._index_texts(texts, source=url)
 
-        # Remove any newline characters
-        text = text.replace("\n", " ")
-
-        # Chunk the text to prevent exceeding the context window of models at the question generation step.
-        chunk_size = kwargs.get("chunk_size", 1024)
-        chunk_overlap = kwargs.get("chunk_overlap", 100)
-
-        # Split by tokens
-        token_splitter = TokenTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-        )
-
-        # Chunk the text
-        texts = token_splitter.split_text(text)
-
-        return self.generate_from_texts(texts=texts, max_questions=max_questions, kwargs=kwargs)
+        return self.generate_from_texts(texts=texts, max_questions=max_questions, **kwargs)
 
     def generate_from_10K(
         self,
@@ -178,28 +168,21 @@ class DatasetGenerator:
         :param year: The year of the filing.
         :param max_questions: Maximum number of questions to generate.
         :param sec_identity: The identity to use when making requests to the SEC API.
+        :param kwargs: Additional arguments like item_names, include_financials, chunk_size, etc.
 
         :return: Dataset containing the generated questions.
         """
 
-        # Get optional item names from kwargs
-        item_names = kwargs.get("item_names", [])
-
-        # Get the items from the 10-K
+        # Look up the 10-K once and read both its items and its financials from it
         filing_parser = FilingParser()
-        items = filing_parser.get_10K_items(ticker, year, item_names, sec_identity)
+        filing = filing_parser.get_10K_filing(ticker, year, sec_identity)
+        texts = self._chunk_filing(filing_parser, filing, **kwargs)
 
-        # Chunk Items to prevent exceeding the context window of models at the question generation step.
-        chunk_size = kwargs.get("chunk_size", 1024)
-        chunk_overlap = kwargs.get("chunk_overlap", 100)
-        token_splitter = TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        texts = []  # List to hold the chunked items
-        for item in items:
-            chunks = token_splitter.split_text(item)
-            texts.extend(chunks)
+        # Cache the chunks so that they can be retrieved by later queries
+        self._index_texts(texts, source=f"{ticker} 10-K {year}")
 
         # Generate questions from the extracted text
-        return self.generate_from_texts(texts=texts, max_questions=max_questions, kwargs=kwargs)
+        return self.generate_from_texts(texts=texts, max_questions=max_questions, **kwargs)
 
     def generate_from_10Q(
         self,
@@ -218,25 +201,144 @@ class DatasetGenerator:
         :param quarter: The quarter of the filing.
         :param max_questions: Maximum number of questions to generate.
         :param sec_identity: The identity to use when making requests to the SEC API.
+        :param kwargs: Additional arguments like item_names, include_financials, chunk_size, etc.
 
         :return: Dataset containing the generated questions.
         """
 
+        # Look up the 10-Q once, since finding it downloads the quarter's full-text index
+        filing_parser = FilingParser()
+        filing = filing_parser.get_10Q_filing(ticker, year, quarter, sec_identity)
+        texts = self._chunk_filing(filing_parser, filing, **kwargs)
+
+        # Cache the chunks so that they can be retrieved by later queries
+        self._index_texts(texts, source=f"{ticker} 10-Q {year} Q{quarter}")
+
+        # Generate questions from the extracted text
+        return self.generate_from_texts(texts=texts, max_questions=max_questions, **kwargs)
+
+    def generate_from_query(
+        self,
+        query: str,
+        max_questions=10,
+        top_k=10,
+        **kwargs,
+    ) -> Dataset:
+        """
+        Generate questions from the chunks most relevant to a query, across all filings and PDFs in the index.
+
+        :param query: The topic to generate questions about, e.g. "liquidity" or "segment revenue".
+        :param max_questions: Maximum number of questions to generate.
+        :param top_k: The number of chunks to retrieve from the index.
+        :param kwargs: Additional arguments like num_probes, system_prompt, etc.
+
+        :return: Dataset containing the generated questions.
+        """
+        if self._index is None:
+            raise ValueError("An index is required to generate questions from a query.")
+
+        if not query:
+            raise ValueError("Query is required.")
+
+        # Retrieve only the relevant chunks so that the LLM does not see the rest of the filings
+        results = self._index.search(query, top_k=top_k, num_probes=kwargs.get("num_probes"))
+        texts = [text for text, _ in results]
+
+        # Weight each chunk by its similarity so that the most relevant chunks are not outranked by merely numeric ones
+        kwargs["weights"] = [score for _, score in results]
+
+        return self.generate_from_texts(texts=texts, max_questions=max_questions, **kwargs)
+
+    def index_pdf(self, url: str, **kwargs) -> int:
+        """
+        Add the chunks of a PDF file to the index without generating any questions.
+
+        :param url: The URL of the PDF file.
+        :param kwargs: Additional arguments like chunk_size, chunk_overlap, etc.
+        :return: The number of chunks added.
+        """
+        self._require_index()
+        return self._index.add(self._chunk_pdf(url, **kwargs), source=url)
+
+    def index_10K(self, ticker: str, year: int, sec_identity=default_sec_identity, **kwargs) -> int:
+        """
+        Add the chunks of a 10-K filing to the index without generating any questions.
+
+        :param ticker: The stock ticker symbol.
+        :param year: The year of the filing.
+        :param sec_identity: The identity to use when making requests to the SEC API.
+        :param kwargs: Additional arguments like item_names, include_financials, chunk_size, etc.
+        :return: The number of chunks added.
+        """
+        self._require_index()
+        filing_parser = FilingParser()
+        filing = filing_parser.get_10K_filing(ticker, year, sec_identity)
+        texts = self._chunk_filing(filing_parser, filing, **kwargs)
+        return self._index.add(texts, source=f"{ticker} 10-K {year}")
+
+    def index_10Q(self, ticker: str, year: int, quarter: int, sec_identity=default_sec_identity, **kwargs) -> int:
+        """
+        Add the chunks of a 10-Q filing to the index without generating any questions.
+
+        :param ticker: The stock ticker symbol.
+        :param year: The year of the filing.
+        :param quarter: The quarter of the filing.
+        :param sec_identity: The identity to use when making requests to the SEC API.
+        :param kwargs: Additional arguments like item_names, include_financials, chunk_size, etc.
+        :return: The number of chunks added.
+        """
+        self._require_index()
+        filing_parser = FilingParser()
+        filing = filing_parser.get_10Q_filing(ticker, year, quarter, sec_identity)
+        texts = self._chunk_filing(filing_parser, filing, **kwargs)
+        return self._index.add(texts, source=f"{ticker} 10-Q {year} Q{quarter}")
+
+    def _chunk_pdf(self, url: str, **kwargs) -> List[str]:
+        # Download the PDF file
+        response = requests.get(url)
+        pdf_file = BytesIO(response.content)
+
+        # Extract text from the PDF file
+        reader = PdfReader(pdf_file)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text()
+
+        # Remove any newline characters
+        text = text.replace("\n", " ")
+
+        return self._split([text], **kwargs)
+
+    def _chunk_filing(self, filing_parser: FilingParser, filing, **kwargs) -> List[str]:
         # Get optional item names from kwargs
         item_names = kwargs.get("item_names", [])
 
-        # Get the items from the 10-Q
-        filing_parser = FilingParser()
-        items = filing_parser.get_10Q_items(ticker, year, quarter, item_names, sec_identity)
+        items = filing_parser.get_items(filing, item_names)
+        texts = self._split(items, **kwargs)
+
+        # Optionally add the financial statements as compact tables
+        if kwargs.get("include_financials", False):
+            financials = filing_parser.get_financials(filing)
+            texts.extend(financials.to_texts())
 
-        # Chunk Items to prevent exceeding the context window of models at the question generation step.
+        return texts
+
+    def _split(self, texts: List[str], **kwargs) -> List[str]:
+        # Chunk the texts to prevent exceeding the context window of models at the question generation step.
         chunk_size = kwargs.get("chunk_size", 1024)
         chunk_overlap = kwargs.get("chunk_overlap", 100)
-        token_splitter = TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-        texts = []  # List to hold the chunked items
-        for item in items:
-            chunks = token_splitter.split_text(item)
-            texts.extend(chunks)
 
-        # Generate questions from the extracted text
-        return self.generate_from_texts(texts=texts, max_questions=max_questions, kwargs=kwargs)
+        # Split by tokens
+        token_splitter = TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        chunks = []
+        for text in texts:
+            chunks.extend(token_splitter.split_text(text))
+        return chunks
+
+    def _require_index(self):
+        if self._index is None:
+            raise ValueError("An index is required to add chunks to it.")
+
+    def _index_texts(self, texts: List[str], source: str):
+        if self._index is not None:
+            self._index.add(texts, source=source)
@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from typing import List, Optional, Protocol, Tuple
+
+import numpy as np
+
+token_pattern = re.compile(r"[a-z0-9$%][a-z0-9$%.,'-]*")
+
+
+class Embedder(Protocol):
+    """
+    Anything that can turn a list of texts into a 2D array of embeddings, one row per text.
+
+    Plug in a local model (e.g. a sentence-transformers model wrapped in an `embed` method)
+    to get semantic retrieval instead of the default hashing embedder.
+    """
+
+    name: str
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder that hashes unigrams and bigrams into a fixed number of dimensions.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = token_pattern.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                # Use a stable hash so that embeddings are the same across processes
+                hashed = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if hashed & 1 else -1.0
+                embeddings[row, (hashed >> 1) % self.dim] += sign
+
+        return normalize(embeddings)
+
+
+def normalize(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2 normalize each row so that a dot product is a cosine similarity.
+
+    :param embeddings: 2D array of embeddings.
+    :return: The normalized embeddings as float32.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class ChunkIndex:
+    """
+    Persistent vector index over text chunks.
+
+    Embeddings are appended to a raw float32 file that is memory-mapped at query time, and chunk
+    texts are read from disk by byte offset only for the search results, so only the offsets,
+    hashes and sources of the chunks are kept in memory. An optional IVF (inverted file) index
+    built with spherical k-means narrows each query down to the closest clusters instead of
+    scanning every chunk.
+
+    meta.json is written last on every add, and its count marks how many rows of the other files
+    are complete. Rows past the count, left by an add that failed part way, are ignored and
+    overwritten by the next add.
+    """
+
+    search_batch_size = 65536
+
+    def __init__(self, path: str, embedder: Optional[Embedder] = None):
+        """
+        Open the index stored in `path`, creating it if it does not exist yet.
+
+        :param path: Directory to store the index in.
+        :param embedder: The embedder to use. Defaults to a HashingEmbedder.
+        """
+        self._path = path
+        self._embedder = embedder or HashingEmbedder()
+        os.makedirs(path, exist_ok=True)
+
+        self._meta = {"embedder": self._embedder.name, "dim": None, "count": 0}
+        if os.path.exists(self._file("meta.json")):
+            with open(self._file("meta.json")) as f:
+                self._meta = json.load(f)
+
+        if self._meta["embedder"] != self._embedder.name:
+            raise ValueError(
+                f"Index at {path} was built with embedder {self._meta['embedder']}, not {self._embedder.name}."
+            )
+
+        # Find where each chunk starts in chunks.jsonl, without keeping the texts in memory
+        self._offsets: List[int] = []
+        self._hashes = set()
+        self._sources = set()
+        self._chunks_size = 0
+        if os.path.exists(self._file("chunks.jsonl")):
+            with open(self._file("chunks.jsonl"), "rb") as f:
+                for line in f:
+                    if len(self._offsets) >= self._meta["count"]:
+                        break
+                    chunk = json.loads(line)
+                    self._offsets.append(self._chunks_size)
+                    self._hashes.add(chunk["hash"])
+                    self._sources.add(chunk["source"])
+                    self._chunks_size += len(line)
+
+    def __len__(self) -> int:
+        return self._meta["count"]
+
+    @property
+    def sources(self) -> List[str]:
+        return sorted(self._sources)
+
+    @property
+    def has_ann(self) -> bool:
+        return os.path.exists(self._file("centroids.npy"))
+
+    def add(self, texts: List[str], source: str) -> int:
+        """
+        Embed and add chunks to the index. Chunks that are already in the index are skipped.
+
+        :param texts: The chunks to add.
+        :param source: Where the chunks came from, e.g. "AAPL 10-K 2023".
+        :return: The number of chunks added.
+        """
+        new_chunks = []
+        new_hashes = set()
+        for text in texts:
+            text_hash = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            if text_hash in self._hashes or text_hash in new_hashes:
+                continue
+            new_hashes.add(text_hash)
+            new_chunks.append({"text": text, "source": source, "hash": text_hash})
+
+        if not new_chunks:
+            return 0
+
+        embeddings = normalize(self._embedder.embed([chunk["text"] for chunk in new_chunks]))
+        if self._meta["dim"] is None:
+            self._meta["dim"] = int(embeddings.shape[1])
+
+        # Drop any rows left by an add that failed part way, so that the files stay aligned with the count
+        self._truncate(self._file("embeddings.f32"), self._meta["count"] * self._meta["dim"] * 4)
+        self._truncate(self._file("chunks.jsonl"), self._chunks_size)
+
+        # Append the embeddings and chunks to the end of their files
+        with open(self._file("embeddings.f32"), "ab") as f:
+            f.write(embeddings.tobytes())
+        offsets = []
+        chunks_size = self._chunks_size
+        with open(self._file("chunks.jsonl"), "ab") as f:
+            for chunk in new_chunks:
+                line = (json.dumps(chunk) + "\n").encode("utf-8")
+                f.write(line)
+                offsets.append(chunks_size)
+                chunks_size += len(line)
+
+        # Keep the ANN index usable by assigning the new chunks to their closest clusters
+        if self.has_ann:
+            centroids = np.load(self._file("centroids.npy"))
+            assignments = np.load(self._file("assignments.npy"))[:self._meta["count"]]
+            new_assignments = np.argmax(embeddings @ centroids.T, axis=1).astype(np.int32)
+            np.save(self._file("assignments.npy"), np.concatenate([assignments, new_assignments]))
+
+        # Commit the add by saving the new count, and only then mark the chunks as seen
+        self._save_meta(dict(self._meta, count=self._meta["count"] + len(new_chunks)))
+        self._offsets.extend(offsets)
+        self._chunks_size = chunks_size
+        self._hashes.update(new_hashes)
+        self._sources.add(source)
+
+        return len(new_chunks)
+
+    def build_ann(self, num_lists: Optional[int] = None, num_iterations: int = 10, seed: int = 0):
+        """
+        Cluster the embeddings with spherical k-means so that queries only scan the closest clusters.
+
+        :param num_lists: The number of clusters. Defaults to the square root of the number of chunks.
+        :param num_iterations: The number of k-means iterations.
+        :param seed: Random seed for picking the initial centroids.
+        """
+        embeddings = self._embeddings()
+        if embeddings is None:
+            raise ValueError("Cannot build an ANN index over an empty index.")
+
+        num_chunks = embeddings.shape[0]
+        num_lists = min(num_lists or max(1, int(np.sqrt(num_chunks))), num_chunks)
+
+        rng = np.random.default_rng(seed)
+        centroids = np.array(embeddings[rng.choice(num_chunks, size=num_lists, replace=False)])
+        assignments = np.zeros(num_chunks, dtype=np.int32)
+        for _ in range(num_iterations):
+            assignments = self._assign(embeddings, centroids)
+            for cluster in range(num_lists):
+                members = embeddings[assignments == cluster]
+                if len(members):
+                    centroids[cluster] = members.sum(axis=0)
+            centroids = normalize(centroids)
+
+        np.save(self._file("centroids.npy"), centroids)
+        np.save(self._file("assignments.npy"), self._assign(embeddings, centroids))
+
+    def search(self, query: str, top_k: int = 10, num_probes: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Find the chunks most similar to the query.
+
+        :param query: The query text, e.g. "liquidity and capital resources".
+        :param top_k: The number of chunks to return.
+        :param num_probes: The number of clusters to scan when an ANN index is built. Defaults to a tenth of them.
+        :return: A list of (chunk, score) tuples, most similar first.
+        """
+        embeddings = self._embeddings()
+        if embeddings is None:
+            return []
+
+        query_embedding = normalize(self._embedder.embed([query]))[0]
+
+        if self.has_ann:
+            centroids = np.load(self._file("centroids.npy"))
+            assignments = np.load(self._file("assignments.npy"), mmap_mode="r")[:self._meta["count"]]
+            num_probes = num_probes or max(1, len(centroids) // 10)
+            clusters = np.argsort(-(centroids @ query_embedding))[:num_probes]
+            candidates = np.flatnonzero(np.isin(assignments, clusters))
+        else:
+            candidates = np.arange(embeddings.shape[0])
+
+        # Score the candidates in batches to bound memory usage
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), self.search_batch_size):
+            batch = candidates[start:start + self.search_batch_size]
+            scores[start:start + len(batch)] = embeddings[batch] @ query_embedding
+
+        top_k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, top_k - 1)[:top_k] if top_k else np.array([], dtype=np.int64)
+        top = top[np.argsort(-scores[top])]
+
+        # Read only the texts of the results from disk
+        results = []
+        with open(self._file("chunks.jsonl"), "rb") as f:
+            for i in top:
+                f.seek(self._offsets[candidates[i]])
+                results.append((json.loads(f.readline())["text"], float(scores[i])))
+        return results
+
+    def _embeddings(self) -> Optional[np.ndarray]:
+        if not self._meta["count"]:
+            return None
+        return np.memmap(
+            self._file("embeddings.f32"),
+            dtype=np.float32,
+            mode="r",
+            shape=(self._meta["count"], self._meta["dim"]),
+        )
+
+    def _assign(self, embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignments = np.empty(embeddings.shape[0], dtype=np.int32)
+        for start in range(0, embeddings.shape[0], self.search_batch_size):
+            batch = np.asarray(embeddings[start:start + self.search_batch_size])
+            assignments[start:start + len(batch)] = np.argmax(batch @ centroids.T, axis=1)
+        return assignments
+
+    def _truncate(self, path: str, size: int):
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+    def _save_meta(self, meta: dict):
+        with open(self._file("meta.json"), "w") as f:
+            json.dump(meta, f)
+        self._meta = meta
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self._path, name)
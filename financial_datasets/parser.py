@@ -1,14 +1,22 @@
 import re
+from collections import OrderedDict
 from typing import List
 
 from edgar import Company, set_identity, get_filings
 
 from financial_datasets.filings import filter_filings, FilingItem
+from financial_datasets.financials import FilingFinancials
 
 default_sec_identity = "gary gary@financialdatasets.org"
 
 valid_item_names = set([item.value for item in FilingItem])
 
+# Financials that have already been extracted, keyed by accession number, least recently used first
+financials_cache: OrderedDict[str, FilingFinancials] = OrderedDict()
+
+# The number of filings whose financials are kept in financials_cache
+financials_cache_size = 8
+
 
 class FilingParser:
 
@@ -30,75 +38,120 @@ class FilingParser:
         :return: A list of items from the 10-K filing.
         """
 
-        # Ensure item_names are valid
-        if any(item_name not in valid_item_names for item_name in item_names):
-            raise ValueError(f"Item names may only be one of {sorted(valid_item_names)}.")
-
-        # Tell the SEC who is making the request
-        set_identity(sec_identity)
+        # Ensure item_names are valid before making any requests
+        self._validate_item_names(item_names)
 
-        if not ticker:
-            raise ValueError("Ticker symbol is required.")
+        # Retrieve the SEC filing
+        filing = self.get_10K_filing(ticker, year, sec_identity)
 
-        if not year:
-            raise ValueError("Year is required.")
+        return self.get_items(filing, item_names)
 
-        # Create a Company object
-        company = Company(ticker)
+    def get_10Q_items(
+        self,
+        ticker: str,
+        year: int,
+        quarter: int,
+        item_names: List[str] = [],
+        sec_identity=default_sec_identity,
+    ) -> List[str]:
+        """
+        Get the items from a 10-Q filing for a given company, year, and quarter.
 
-        # Retrieve the SEC filing
-        filings = company.get_filings(form="10-K")
-        filing = filter_filings(filings, "10-K", year).obj()
+        :param ticker: The stock ticker symbol.
+        :param year: The year of the filing.
+        :param quarter: The quarter of the filing.
+        :param item_names: List of Items to retrieve from the 10-Q.
+        :param sec_identity: The identity to use when making requests to the SEC API.
 
-        # Get the Item names in the filing
-        filing_item_names = set([item_name for item_name in filing.items])
+        :return: A list of items from the 10-Q filing.
+        """
 
-        # Figure out which Items to return
-        items_to_return = [] if item_names else filing.items
-        for item_name in item_names:
-            if item_name in filing_item_names:
-                items_to_return.append(item_name)
+        # Ensure item_names are valid before making any requests
+        self._validate_item_names(item_names)
 
-        # Get the items
-        items = [filing[item] for item in items_to_return]
+        # Get the exact 10-Q filing for the company
+        filing = self.get_10Q_filing(ticker, year, quarter, sec_identity)
 
-        # Remove any newline characters and trim outer whitespace
-        items = [item.replace("\n", " ").strip() for item in items]
+        return self.get_items(filing, item_names)
 
-        # Remove any sequence of 3 or more '-' or '.' characters
-        pattern1 = r'-{3,}|\.{3,}'
-        items = [re.sub(pattern1, '', item) for item in items]
+    def get_10K_financials(
+        self,
+        ticker: str,
+        year: int,
+        sec_identity=default_sec_identity,
+    ) -> FilingFinancials:
+        """
+        Get the XBRL facts and financial statements from a 10-K filing for a given company and year.
 
-        # Remove any sequence of 2 or more '+' characters
-        pattern2 = r'\+{2,}'
-        items = [re.sub(pattern2, '', item) for item in items]
+        :param ticker: The stock ticker symbol.
+        :param year: The year of the filing.
+        :param sec_identity: The identity to use when making requests to the SEC API.
 
-        return items
+        :return: The financials of the 10-K filing.
+        """
+        return self.get_financials(self.get_10K_filing(ticker, year, sec_identity))
 
-    def get_10Q_items(
+    def get_10Q_financials(
         self,
         ticker: str,
         year: int,
         quarter: int,
-        item_names: List[str] = [],
         sec_identity=default_sec_identity,
-    ) -> List[str]:
+    ) -> FilingFinancials:
         """
-        Get the items from a 10-Q filing for a given company, year, and quarter.
+        Get the XBRL facts and financial statements from a 10-Q filing for a given company, year, and quarter.
 
         :param ticker: The stock ticker symbol.
         :param year: The year of the filing.
         :param quarter: The quarter of the filing.
-        :param item_names: List of Items to retrieve from the 10-Q.
         :param sec_identity: The identity to use when making requests to the SEC API.
 
-        :return: A list of items from the 10-Q filing.
+        :return: The financials of the 10-Q filing.
         """
+        return self.get_financials(self.get_10Q_filing(ticker, year, quarter, sec_identity))
 
-        # Ensure item_names are valid
-        if any(item_name not in valid_item_names for item_name in item_names):
-            raise ValueError(f"Item names may only be one of {sorted(valid_item_names)}.")
+    def get_10K_filing(self, ticker: str, year: int, sec_identity=default_sec_identity):
+        """
+        Look up the 10-K filing for a given company and year.
+
+        Pass the filing to get_items and get_financials to read both without looking it up twice.
+
+        :param ticker: The stock ticker symbol.
+        :param year: The year of the filing.
+        :param sec_identity: The identity to use when making requests to the SEC API.
+
+        :return: The edgar filing.
+        """
+        # Tell the SEC who is making the request
+        set_identity(sec_identity)
+
+        if not ticker:
+            raise ValueError("Ticker symbol is required.")
+
+        if not year:
+            raise ValueError("Year is required.")
+
+        # Create a Company object
+        company = Company(ticker)
+
+        # Retrieve the SEC filing
+        filings = company.get_filings(form="10-K")
+        return filter_filings(filings, "10-K", year)
+
+    def get_10Q_filing(self, ticker: str, year: int, quarter: int, sec_identity=default_sec_identity):
+        """
+        Look up the 10-Q filing for a given company, year, and quarter.
+
+        This downloads the full-text index of every 10-Q filed in the quarter, so pass the filing
+        to get_items and get_financials rather than looking it up again.
 
+        :param ticker: The stock ticker symbol.
+        :param year: The year of the filing.
+        :param quarter: The quarter of the filing.
+        :param sec_identity: The identity to use when making requests to the SEC API.
+
+        :return: The edgar filing.
+        """
         # Tell the SEC who is making the request
         set_identity(sec_identity)
 
@@ -124,21 +177,64 @@ class FilingParser:
         if not company_filings:
             raise ValueError(f"No 10-Q filing found for {ticker} in {year} Q{quarter}.")
 
-        # Get the exact 10-Q filing for the company
-        company_filing = company_filings[0].obj()
+        return company_filings[0]
+
+    def get_items(self, filing, item_names: List[str] = []) -> List[str]:
+        """
+        Get the items from a filing returned by get_10K_filing or get_10Q_filing.
+
+        :param filing: The edgar filing.
+        :param item_names: List of Items to retrieve. Defaults to all of them.
+
+        :return: A list of items from the filing.
+        """
+        self._validate_item_names(item_names)
+
+        report = filing.obj()
 
         # Get the Item names in the filing
-        filing_item_names = set([item_name for item_name in company_filing.items])
+        filing_item_names = set([item_name for item_name in report.items])
 
         # Figure out which Items to return
-        items_to_return = [] if item_names else company_filing.items
+        items_to_return = [] if item_names else report.items
         for item_name in item_names:
             if item_name in filing_item_names:
                 items_to_return.append(item_name)
 
         # Get the items
-        items = [company_filing[item] for item in items_to_return]
+        items = [report[item] for item in items_to_return]
+
+        return self._clean_items(items)
+
+    def get_financials(self, filing) -> FilingFinancials:
+        """
+        Get the XBRL facts and financial statements from a filing returned by get_10K_filing or get_10Q_filing.
+
+        :param filing: The edgar filing.
+
+        :return: The financials of the filing.
+        """
+        # Parsing the XBRL is expensive, so keep the financials of the most recently used filings
+        if filing.accession_number in financials_cache:
+            financials_cache.move_to_end(filing.accession_number)
+            return financials_cache[filing.accession_number]
+
+        xbrl = filing.xbrl()
+        if not xbrl:
+            raise ValueError(f"No XBRL data found for {filing.form} filing {filing.accession_number}.")
+        financials = FilingFinancials.from_xbrl(xbrl, filing.form)
+
+        financials_cache[filing.accession_number] = financials
+        while len(financials_cache) > financials_cache_size:
+            financials_cache.popitem(last=False)
+
+        return financials
+
+    def _validate_item_names(self, item_names: List[str]):
+        if any(item_name not in valid_item_names for item_name in item_names):
+            raise ValueError(f"Item names may only be one of {sorted(valid_item_names)}.")
 
+    def _clean_items(self, items: List[str]) -> List[str]:
         # Remove any newline characters and trim outer whitespace
         items = [item.replace("\n", " ").strip() for item in items]
 
@@ -0,0 +1,149 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from financial_datasets.dataset import Dataset, DatasetItem
+from financial_datasets.financials import FilingFinancials, format_value, period_columns
+
+month_words = {3: "three", 6: "six", 9: "nine", 12: "twelve"}
+
+
+def generate_from_financials(financials: FilingFinancials, max_questions: Optional[int] = None) -> Dataset:
+    """
+    Generate questions from the financial statements of a filing using templates, without calling an LLM.
+
+    Generates a question for the value of each line item in each period, and for the percentage
+    change of each line item between consecutive periods. The items can be combined with
+    LLM-generated items, e.g. Dataset(items=llm_dataset.items + programmatic_dataset.items).
+
+    Income and cash flow statement values are described by their duration, e.g. "for the three
+    months ended", from the start date of the underlying fact. Values whose duration cannot be
+    determined are skipped rather than described ambiguously. The context of each item is the statement
+    table as it appears in FilingFinancials.to_texts, so the items can be checked with verify_dataset.
+
+    :param financials: The financials of a filing, from FilingParser.get_10K_financials or get_10Q_financials.
+    :param max_questions: Maximum number of questions to generate. Defaults to all of them.
+
+    :return: Dataset containing the generated questions.
+    """
+    items: List[DatasetItem] = []
+    seen_questions = set()
+    for item in _generate_items(financials):
+        if max_questions is not None and len(items) >= max_questions:
+            break
+
+        # Line items like net income appear in more than one statement
+        if item.question in seen_questions:
+            continue
+        seen_questions.add(item.question)
+
+        items.append(item)
+
+    return Dataset(items=items)
+
+
+def _generate_items(financials: FilingFinancials) -> Iterator[DatasetItem]:
+    company = financials.company
+    durations = _durations(financials.facts)
+    for name, statement in financials.statements.items():
+        periods = period_columns(statement)
+        header = financials.statement_header(name)
+
+        for fact, row in zip(statement.index, statement.to_dict("records")):
+            # Quote the statement as it appears in to_texts, so that the items can be verified against it
+            context = "\n".join(header + [financials.statement_row(name, fact)])
+            label = row["label"]
+            units = row["units"] if not pd.isna(row["units"]) else None
+            values = [row[period] for period in periods]
+            phrases = [
+                _period_phrase(name, financials.form, period, durations.get((fact, period, value)))
+                for period, value in zip(periods, values)
+            ]
+
+            for index, value in enumerate(values):
+                # Skip values whose period cannot be stated unambiguously
+                if pd.isna(value) or phrases[index] is None:
+                    continue
+
+                amount = format_amount(value, units)
+
+                yield DatasetItem(
+                    question=f"What was {company}'s {label.lower()} {phrases[index]}?",
+                    answer=amount,
+                    context=context,
+                )
+
+                # Compare with the prior period, which is the next column, only if it covers as long a period
+                if index + 1 >= len(values) or phrases[index + 1] is None:
+                    continue
+                prior_value = values[index + 1]
+                if pd.isna(prior_value) or prior_value == 0:
+                    continue
+                if durations.get((fact, periods[index], value)) != durations.get((fact, periods[index + 1], prior_value)):
+                    continue
+
+                change = (value - prior_value) / abs(prior_value) * 100
+                direction = "increase" if change >= 0 else "decrease"
+
+                yield DatasetItem(
+                    question=f"By what percentage did {company}'s {label.lower()} {direction} "
+                             f"{phrases[index]} compared to the prior period?",
+                    answer=f"{abs(change):.1f}%",
+                    context=context,
+                )
+
+
+def _durations(facts: pd.DataFrame) -> Dict[Tuple[str, str, float], Optional[int]]:
+    # A 10-Q reports both three month and year to date values that end on the same date, and the
+    # statement columns only keep one of them, so look up which one it was from the facts
+    durations: Dict[Tuple[str, str, float], Optional[int]] = {}
+    facts = facts.dropna(subset=["start_date", "end_date"])
+    for fact, start_date, end_date, value in zip(facts["fact"], facts["start_date"], facts["end_date"], facts["value"]):
+        key = (fact, f"{end_date:%Y-%m-%d}", value)
+        months = round((end_date - start_date).days / 30.44)
+
+        # The same value reported for two durations cannot be attributed to either
+        durations[key] = months if durations.get(key, months) == months else None
+
+    return durations
+
+
+def _period_phrase(statement_name: str, form: str, period: str, months: Optional[int]) -> Optional[str]:
+    date = datetime.strptime(period, "%Y-%m-%d")
+    date_str = f"{date:%B} {date.day}, {date.year}"
+
+    # Balance sheet values are at a point in time, the other statements cover a period
+    if statement_name == "balance_sheet":
+        return f"as of {date_str}"
+    if months == 12 and form == "10-K":
+        return f"for the fiscal year ended {date_str}"
+    if months in month_words:
+        return f"for the {month_words[months]} months ended {date_str}"
+    return None
+
+
+def format_amount(value: float, units: Optional[str]) -> str:
+    """
+    Format a reported value the way it would be written in prose, e.g. "$96.77 billion".
+
+    :param value: The value to format.
+    :param units: The XBRL units of the value, e.g. "USD", "USD per shares" or "shares".
+    :return: The formatted value.
+    """
+    if units == "USD":
+        sign = "-" if value < 0 else ""
+        return f"{sign}${_scale(abs(value))}"
+    if units == "USD per shares":
+        sign = "-" if value < 0 else ""
+        return f"{sign}${abs(value):,.2f} per share"
+    if units == "shares":
+        return f"{_scale(value)} shares"
+    return format_value(value)
+
+
+def _scale(value: float) -> str:
+    for threshold, suffix in [(1e12, "trillion"), (1e9, "billion"), (1e6, "million")]:
+        if abs(value) >= threshold:
+            return f"{value / threshold:,.2f} {suffix}"
+    return f"{value:,.0f}"
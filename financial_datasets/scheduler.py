@@ -0,0 +1,147 @@
+import math
+import re
+from typing import Iterator, List, Optional, Tuple
+
+# Weights used when scoring a chunk's expected question yield
+base_weight = 0.25
+numeric_weight = 10.0
+entity_weight = 2.5
+
+# Number of words at which a chunk is considered long enough to be fully useful
+target_words = 200
+
+numeric_pattern = re.compile(r'\$?\d[\d,]*(?:\.\d+)?%?')
+entity_pattern = re.compile(r'(?<![.!?]\s)(?<!^)\b[A-Z][a-zA-Z&]+(?:\s+[A-Z][a-zA-Z&]+)*')
+
+
+def clean_text(text: str) -> str:
+    """
+    Collapse whitespace and remove separator runs so that scoring only sees real content.
+
+    :param text: The text to clean.
+    :return: The cleaned text.
+    """
+    text = re.sub(r'-{3,}|\.{3,}|\+{2,}', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def score_text(text: str) -> float:
+    """
+    Estimate how many useful questions a chunk of text is likely to yield.
+
+    The score only uses cheap local heuristics: the length of the text after cleaning,
+    the density of numbers (amounts, percentages, years) and the density of named entities.
+
+    :param text: The text to score.
+    :return: A non-negative score, where 0 means the chunk should not be sent to the LLM.
+    """
+    text = clean_text(text)
+    words = text.split()
+    if not words:
+        return 0.0
+
+    num_words = len(words)
+    length_factor = min(num_words / target_words, 1.0)
+    numeric_density = len(numeric_pattern.findall(text)) / num_words
+    entity_density = len(set(entity_pattern.findall(text))) / num_words
+
+    return length_factor * (base_weight + numeric_weight * numeric_density + entity_weight * entity_density)
+
+
+def allocate_questions(scores: List[float], max_questions: int) -> List[int]:
+    """
+    Split max_questions across chunks in proportion to their scores using the largest remainder method.
+
+    :param scores: The score of each chunk.
+    :param max_questions: The total number of questions to allocate.
+    :return: The number of questions allocated to each chunk.
+    """
+    total_score = sum(scores)
+    if total_score <= 0 or max_questions <= 0:
+        return [0] * len(scores)
+
+    shares = [max_questions * score / total_score for score in scores]
+    quotas = [math.floor(share) for share in shares]
+
+    # Hand out the remaining questions to the chunks with the largest remainders, ties broken by score
+    num_remaining_questions = max_questions - sum(quotas)
+    by_remainder = sorted(
+        (index for index, score in enumerate(scores) if score > 0),
+        key=lambda index: (shares[index] - quotas[index], scores[index]),
+        reverse=True,
+    )
+    for index in by_remainder[:num_remaining_questions]:
+        quotas[index] += 1
+
+    return quotas
+
+
+class ChunkScheduler:
+    """
+    Decides which chunks to send to the LLM, in which order, and how many questions to ask for.
+
+    Chunks are dispatched in order of expected yield. When a chunk delivers fewer questions than
+    it was asked for, the shortfall is spread over the chunks that have not been dispatched yet.
+    """
+
+    def __init__(self, texts: List[str], max_questions: int, weights: Optional[List[float]] = None):
+        """
+        :param texts: The chunks to schedule.
+        :param max_questions: The total number of questions to generate.
+        :param weights: Optional non-negative weight per chunk that its score is multiplied by, e.g. its retrieval similarity.
+        """
+        if weights is not None and len(weights) != len(texts):
+            raise ValueError("weights must have one entry per text.")
+
+        weights = weights if weights is not None else [1.0] * len(texts)
+        self._max_questions = max_questions
+        self._scores = [score_text(text) * max(weight, 0.0) for text, weight in zip(texts, weights)]
+        self._quotas = allocate_questions(self._scores, max_questions)
+
+        # Dispatch the highest scoring chunks first, skipping chunks that have nothing to offer
+        self._order = sorted(
+            (index for index, score in enumerate(self._scores) if score > 0),
+            key=lambda index: self._scores[index],
+            reverse=True,
+        )
+        self._num_generated = 0
+
+    @property
+    def scores(self) -> List[float]:
+        return self._scores
+
+    @property
+    def quotas(self) -> List[int]:
+        return self._quotas
+
+    def record(self, num_generated: int):
+        """
+        Record the number of questions the last dispatched chunk produced.
+
+        :param num_generated: The number of questions generated.
+        """
+        self._num_generated += num_generated
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (index, num_questions) pairs for the chunks to dispatch.
+
+        Call record() after each dispatch so that shortfalls can be reallocated.
+        """
+        remaining_base = sum(self._quotas[index] for index in self._order)
+        for position, index in enumerate(self._order):
+            num_remaining_questions = self._max_questions - self._num_generated
+            if num_remaining_questions <= 0:
+                return
+
+            # Spread any shortfall evenly over the chunks that are still to be dispatched
+            num_remaining_chunks = len(self._order) - position
+            deficit = num_remaining_questions - remaining_base
+            extra = math.ceil(deficit / num_remaining_chunks) if deficit > 0 else 0
+
+            quota = min(self._quotas[index] + extra, num_remaining_questions)
+            remaining_base -= self._quotas[index]
+            if quota <= 0:
+                continue
+
+            yield index, quota
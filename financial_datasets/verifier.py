@@ -0,0 +1,259 @@
+import os
+import re
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from pydantic.main import BaseModel
+
+from financial_datasets.dataset import Dataset
+
+word_pattern = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+number_pattern = re.compile(r"(\d[\d,]*(?:\.(\d+))?)(?:\s*(thousand|million|billion|trillion)\b)?", re.IGNORECASE)
+
+scales = {"thousand": 1e3, "million": 1e6, "billion": 1e9, "trillion": 1e12}
+
+
+class VerificationResult(BaseModel):
+    source_index: Optional[int]
+    context_score: float
+    numeric_score: float
+    status: str
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "pass"
+
+
+class NgramIndex:
+    """
+    Inverted index from word n-grams to the texts that contain them.
+
+    Words are lowercased and numbers are split from their formatting ("$9.9 billion" becomes
+    "9.9 billion"), so matching tolerates differences in case, punctuation and whitespace.
+    """
+
+    # Only n-grams found in at most this many texts are used to find candidate texts
+    max_postings = 64
+
+    # The number of candidate texts that are scored exactly
+    num_candidates = 4
+
+    def __init__(self, texts: List[str], n: int = 3):
+        self.n = n
+        self._postings: Dict[str, List[int]] = {}
+        self._ngrams: List[frozenset] = []
+        self._numbers: List[List[Tuple[float, float]]] = []
+        self._max_tolerances: List[float] = []
+        for index, text in enumerate(texts):
+            ngrams = frozenset(self.ngrams(text))
+            for ngram in ngrams:
+                self._postings.setdefault(ngram, []).append(index)
+            self._ngrams.append(ngrams)
+            numbers = sorted(parse_numbers(text))
+            self._numbers.append(numbers)
+            self._max_tolerances.append(max((tolerance for _, tolerance in numbers), default=0.0))
+
+    def ngrams(self, text: str) -> set:
+        words = word_pattern.findall(text.lower().replace(",", ""))
+        if len(words) < self.n:
+            return set(words)
+        return set(" ".join(words[i:i + self.n]) for i in range(len(words) - self.n + 1))
+
+    def numbers(self, index: int) -> set:
+        return set(value for value, _ in self._numbers[index])
+
+    def contains_number(self, index: int, value: float, tolerance: float = 0.0) -> bool:
+        """
+        Check whether an indexed text contains a number, allowing for either side being rounded.
+
+        :param index: The index of the text.
+        :param value: The number to look for, e.g. 9.9e9 for "$9.9 billion".
+        :param tolerance: How far the number may be from the text's number because it was rounded.
+        :return: True if the text contains the number.
+        """
+        numbers = self._numbers[index]
+        window = max(tolerance, self._max_tolerances[index]) + abs(value) * 1e-9
+        position = bisect_left(numbers, (value - window,))
+        while position < len(numbers) and numbers[position][0] <= value + window:
+            number, number_tolerance = numbers[position]
+            if abs(number - value) <= max(tolerance, number_tolerance) + abs(value) * 1e-9:
+                return True
+            position += 1
+        return False
+
+    def match(self, text: str, source_index: Optional[int] = None) -> Tuple[Optional[int], float]:
+        """
+        Find the indexed text that contains the largest fraction of the n-grams of `text`.
+
+        :param text: The text to look up, e.g. the context of a dataset item.
+        :param source_index: Only score this indexed text, when the source is already known.
+        :return: The index of the best matching text and the fraction of n-grams it contains.
+        """
+        ngrams = self.ngrams(text)
+        if not ngrams:
+            return source_index, 0.0
+
+        if source_index is not None:
+            return source_index, self._score(ngrams, source_index)
+
+        # Find candidates using the rarest n-grams, since common ones like "compared to the"
+        # have long posting lists and say little about where the text came from
+        postings = sorted((self._postings[ngram] for ngram in ngrams if ngram in self._postings), key=len)
+        if not postings:
+            return None, 0.0
+
+        counts = Counter()
+        for posting in postings:
+            if len(posting) > self.max_postings and counts:
+                break
+            counts.update(posting[:self.max_postings])
+
+        # Score the best candidates exactly against all of the n-grams
+        candidates = [index for index, _ in counts.most_common(self.num_candidates)]
+        return max(((index, self._score(ngrams, index)) for index in candidates), key=lambda match: match[1])
+
+    def _score(self, ngrams: set, index: int) -> float:
+        return len(ngrams & self._ngrams[index]) / len(ngrams)
+
+
+def extract_numbers(text: str) -> set:
+    """
+    Extract the numbers in a text as floats, ignoring currency symbols, commas and percent signs.
+
+    Scale words are applied, so "$9.9 billion", "$9,900 million" and "9,900,000,000" are all 9.9e9.
+
+    :param text: The text to extract numbers from.
+    :return: The set of numbers in the text.
+    """
+    return set(value for value, _ in parse_numbers(text))
+
+
+def parse_numbers(text: str) -> List[Tuple[float, float]]:
+    """
+    Extract the numbers in a text along with how much each may differ from the exact figure because
+    it was rounded, which is half a unit of its last digit, e.g. 0.05e9 for "$96.8 billion". Plain
+    integers like "2023" or "6,907" are taken to be exact.
+
+    :param text: The text to extract numbers from.
+    :return: A list of (value, tolerance) tuples.
+    """
+    numbers = []
+    for number, decimals, scale in number_pattern.findall(text):
+        multiplier = scales[scale.lower()] if scale else 1.0
+        tolerance = 0.5 * 10 ** -len(decimals) * multiplier if decimals or scale else 0.0
+        numbers.append((float(number.replace(",", "")) * multiplier, tolerance))
+    return numbers
+
+
+def verify_item(
+    index: NgramIndex,
+    context: str,
+    answer: str,
+    source_index: Optional[int] = None,
+    pass_threshold: float = 0.8,
+    fail_threshold: float = 0.3,
+) -> VerificationResult:
+    """
+    Check that the context of an item appears in a source text and that the numbers in its answer occur there.
+
+    Without a matching source text, the answer's numbers cannot be checked and the item fails. When the
+    context is found but the answer's numbers are not, the item is ambiguous, since the answer may be
+    derived from the source, e.g. a percentage change.
+
+    :param index: The index over the source texts.
+    :param context: The context of the item.
+    :param answer: The answer of the item.
+    :param source_index: The index of the source text the item was generated from, if known.
+    :param pass_threshold: The context score at or above which the context counts as found.
+    :param fail_threshold: The context score below which the context counts as not found.
+    :return: The scores and a status of "pass", "fail" or "ambiguous".
+    """
+    source_index, context_score = index.match(context, source_index)
+
+    # An answer without numbers has nothing to cross-check. The numbers are only checked against the
+    # source text, since the context is written by the LLM and may contain the same made-up figure.
+    answer_numbers = parse_numbers(answer)
+    numeric_score = 1.0
+    if answer_numbers:
+        num_found = 0
+        if source_index is not None:
+            num_found = sum(index.contains_number(source_index, value, tolerance) for value, tolerance in answer_numbers)
+        numeric_score = num_found / len(answer_numbers)
+
+    # A well grounded context whose answer has numbers that are not in the source may still be a
+    # correct derived figure, like a percentage change, so it is left for a judge to decide
+    if context_score < fail_threshold or (numeric_score == 0 and context_score < pass_threshold):
+        status = "fail"
+    elif context_score >= pass_threshold and numeric_score == 1:
+        status = "pass"
+    else:
+        status = "ambiguous"
+
+    return VerificationResult(
+        source_index=source_index,
+        context_score=context_score,
+        numeric_score=numeric_score,
+        status=status,
+    )
+
+
+# The index of each worker process, built once by _init_worker
+_worker_index: Optional[NgramIndex] = None
+
+
+def _init_worker(texts: List[str], n: int):
+    global _worker_index
+    _worker_index = NgramIndex(texts, n=n)
+
+
+def _verify_batch(batch: List[Tuple[str, str, Optional[int]]], pass_threshold: float, fail_threshold: float):
+    return [
+        verify_item(_worker_index, context, answer, source_index, pass_threshold, fail_threshold)
+        for context, answer, source_index in batch
+    ]
+
+
+def verify_dataset(
+    dataset: Dataset,
+    texts: List[str],
+    source_indices: Optional[List[Optional[int]]] = None,
+    num_workers: Optional[int] = None,
+    batch_size: int = 10000,
+    pass_threshold: float = 0.8,
+    fail_threshold: float = 0.3,
+    n: int = 3,
+) -> List[VerificationResult]:
+    """
+    Verify every item of a dataset against the texts it was generated from, without calling an LLM.
+
+    Items with a status of "ambiguous" are the ones worth sending to a more expensive judge.
+
+    :param dataset: The dataset to verify.
+    :param texts: The texts the dataset was generated from, e.g. the chunks passed to generate_from_texts.
+    :param source_indices: The index in `texts` each item was generated from, if known. Otherwise the best match is used.
+    :param num_workers: The number of processes to use. Defaults to one per CPU for datasets larger than batch_size.
+    :param batch_size: The number of items sent to a worker at a time.
+    :param pass_threshold: The context score at or above which the context counts as found.
+    :param fail_threshold: The context score below which the context counts as not found.
+    :param n: The number of words per n-gram.
+    :return: A verification result for each item, in the same order as dataset.items.
+    """
+    if source_indices is not None and len(source_indices) != len(dataset.items):
+        raise ValueError("source_indices must have one entry per dataset item.")
+
+    source_indices = source_indices or [None] * len(dataset.items)
+    rows = [(item.context, item.answer, source_index) for item, source_index in zip(dataset.items, source_indices)]
+
+    if num_workers is None:
+        num_workers = (os.cpu_count() or 1) if len(rows) > batch_size else 1
+
+    if num_workers <= 1:
+        index = NgramIndex(texts, n=n)
+        return [verify_item(index, *row, pass_threshold, fail_threshold) for row in rows]
+
+    batches = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+    with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=(texts, n)) as executor:
+        futures = [executor.submit(_verify_batch, batch, pass_threshold, fail_threshold) for batch in batches]
+        return [result for future in futures for result in future.result()]
@@ -0,0 +1,15 @@
+import os
+
+import pytest
+from edgar._xbrl import FilingXbrl
+
+from financial_datasets.financials import FilingFinancials
+
+fixtures_dir = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+@pytest.fixture
+def financials() -> FilingFinancials:
+    with open(os.path.join(fixtures_dir, "tsla-10k-2023-xbrl.xml")) as f:
+        xbrl = FilingXbrl.parse(f.read())
+    return FilingFinancials.from_xbrl(xbrl, "10-K")
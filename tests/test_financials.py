@@ -0,0 +1,27 @@
+def test_from_xbrl(financials):
+    # Then
+    assert financials.company == "Tesla, Inc."
+    assert financials.periods == ["2023-12-31", "2022-12-31", "2021-12-31"]
+    assert financials.facts["value"].dtype == "float64"
+
+    income_statement = financials.statements["income_statement"]
+    assert income_statement.loc["Revenues", "2023-12-31"] == 96773000000
+    assert income_statement.loc["EarningsPerShareDiluted", "label"] == "Earnings Per Share Diluted"
+    assert income_statement.loc["EarningsPerShareDiluted", "units"] == "USD per shares"
+
+
+def test_from_xbrl_excludes_dimensional_facts(financials):
+    # Then
+    revenues = financials.facts.query("fact == 'Revenues'")
+    assert len(revenues) == 3
+    assert 82419000000 not in revenues["value"].tolist()
+
+
+def test_to_texts(financials):
+    # When
+    texts = financials.to_texts()
+
+    # Then
+    assert len(texts) == 3
+    assert texts[0].startswith("Tesla, Inc. Income Statement (10-K, USD, USD per shares)")
+    assert "Revenue | 96,773,000,000 | 81,462,000,000 | 53,823,000,000" in texts[0]
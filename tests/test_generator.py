@@ -1,11 +1,15 @@
+import json
 import os
-from unittest.mock import MagicMock
+import re
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 
 import pytest
 from dotenv import load_dotenv
 
 from financial_datasets.dataset import Dataset, DatasetItem
 from financial_datasets.generator import DatasetGenerator
+from financial_datasets.index import ChunkIndex
 
 # Load the environment variables from .env file
 load_dotenv()
@@ -86,6 +90,144 @@ def test_generate_from_texts_with_mock():
     assert mock_client.chat.completions.create.call_count <= len(texts)
 
 
+def stub_response(dataset_items):
+    tool_call = SimpleNamespace(function=SimpleNamespace(arguments=json.dumps({"dataset_items": dataset_items})))
+    return SimpleNamespace(
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=10 * len(dataset_items)),
+        choices=[SimpleNamespace(message=SimpleNamespace(tool_calls=[tool_call]))],
+    )
+
+
+def test_generate_from_texts_reallocates_questions(capsys):
+    # Given
+    texts = [
+        "We are committed to our mission and our people, and we believe that our culture is a competitive advantage. " * 3,
+        "In 2023, revenue rose 18% to $9.9 billion, gross margin was 25.6%, and operating income reached $8.9 billion, up 12% from $7.9 billion in 2022.",
+        "In 2023, deliveries rose 38% to 1.8 million vehicles, energy storage grew 125% to 14.7 GWh, and capital expenditures were $8.9 billion in 2023.",
+        "Net cash provided by operating activities was $13.3 billion in 2023, which we used to fund our expansion.",
+    ]
+    requested = {}
+
+    def chat_completion_request(model, messages, tools=None, tool_choice=None):
+        prompt = messages[-1]["content"]
+        index = next(i for i, text in enumerate(texts) if prompt.endswith(text))
+        requested[index] = int(re.search(r"Generate (\d+) questions", prompt).group(1))
+
+        # The richest text fails, like chat_completion_request returning the exception after its retries
+        if index == 1:
+            return RuntimeError("rate limited")
+
+        # The next richest text yields no questions
+        if index == 2:
+            return stub_response([])
+
+        return stub_response([
+            {"question": f"Question {index}.{i}", "answer": "Answer", "context": "Context"}
+            for i in range(requested[index])
+        ])
+
+    generator = DatasetGenerator(model="gpt-3.5-turbo", api_key="fake_key")
+
+    # When
+    with patch("financial_datasets.generator.chat_completion_request", chat_completion_request):
+        dataset = generator.generate_from_texts(texts, max_questions=8, request_interval=0)
+
+    # Then
+    assert len(dataset.items) == 8
+
+    # The texts are dispatched best first, and the questions that texts 1 and 2 did not deliver
+    # are spread over the texts that follow them
+    assert list(requested) == [1, 2, 3, 0]
+    assert requested == {1: 3, 2: 4, 3: 4, 0: 4}
+
+    # Batches are numbered by their position in texts, not by dispatch order
+    assert "Failed to generate questions for batch 2" in capsys.readouterr().out
+
+
+def test_generate_from_query(tmp_path):
+    # Given
+    texts = [
+        "Energy storage deployments grew 125% to 14.7 GWh in 2023, and energy generation and storage revenue increased 54% to $6.0 billion.",
+        "In 2023, revenue rose 18% to $96.8 billion, gross margin was 18.2%, operating income was $8.9 billion, and capital expenditures were $8.9 billion, up 24% from $7.2 billion in 2022.",
+        "We are committed to our mission and our people, and we believe that our culture is a competitive advantage.",
+        "Our energy storage products, Powerwall and Megapack, store energy for homes and utilities, and Megapack deployments reached 9.4 GWh.",
+    ]
+    index = ChunkIndex(str(tmp_path))
+    index.add(texts, source="TSLA 10-K 2023")
+    dispatched = []
+
+    def chat_completion_request(model, messages, tools=None, tool_choice=None):
+        prompt = messages[-1]["content"]
+        dispatched.append(next(i for i, text in enumerate(texts) if prompt.endswith(text)))
+        requested = int(re.search(r"Generate (\d+) questions", prompt).group(1))
+        return stub_response([
+            {"question": f"Question {dispatched[-1]}.{i}", "answer": "Answer", "context": "Context"}
+            for i in range(requested)
+        ])
+
+    generator = DatasetGenerator(model="gpt-3.5-turbo", api_key="fake_key", index=index)
+
+    # When
+    with patch("financial_datasets.generator.chat_completion_request", chat_completion_request):
+        dataset = generator.generate_from_query("energy storage deployments", max_questions=4, top_k=3, request_interval=0)
+
+    # Then
+    assert len(dataset.items) == 4
+
+    # The most similar chunk goes first, and the revenue chunk is not sent even though it has the most numbers
+    assert dispatched == [0, 3]
+
+
+def test_index_10K_does_not_generate(tmp_path):
+    # Given
+    index = ChunkIndex(str(tmp_path))
+    generator = DatasetGenerator(model="gpt-3.5-turbo", api_key="fake_key", index=index)
+    items = ["Revenue rose 18% to $96.8 billion in 2023.", "We are subject to legal proceedings."]
+
+    # When
+    with patch("financial_datasets.generator.FilingParser.get_10K_filing", return_value=SimpleNamespace()), \
+            patch("financial_datasets.generator.FilingParser.get_items", return_value=items), \
+            patch("financial_datasets.generator.TokenTextSplitter") as token_splitter, \
+            patch("financial_datasets.generator.chat_completion_request") as chat_completion_request:
+        token_splitter.return_value.split_text.side_effect = lambda text: [text]
+        num_added = generator.index_10K(ticker="TSLA", year=2023)
+
+    # Then
+    assert num_added == 2
+    assert index.sources == ["TSLA 10-K 2023"]
+    chat_completion_request.assert_not_called()
+
+
+def test_generate_from_query_requires_index():
+    # Given
+    generator = DatasetGenerator(model="gpt-3.5-turbo", api_key="fake_key")
+
+    # Then
+    with pytest.raises(ValueError):
+        generator.generate_from_query("liquidity")
+
+
+def test_generate_from_10Q_looks_up_filing_once():
+    # Given
+    filing = SimpleNamespace(obj=lambda: {"Item 2": "Revenue rose 18% to $9.9 billion in the quarter."})
+    financials = SimpleNamespace(to_texts=lambda: ["Income Statement (USD)\nRevenues | 25,167,000,000"])
+    generator = DatasetGenerator(model="gpt-3.5-turbo", api_key="fake_key")
+
+    # When
+    with patch("financial_datasets.generator.FilingParser.get_10Q_filing", return_value=filing) as get_10Q_filing, \
+            patch("financial_datasets.generator.FilingParser.get_items", return_value=["Revenue rose 18% to $9.9 billion."]) as get_items, \
+            patch("financial_datasets.generator.FilingParser.get_financials", return_value=financials) as get_financials, \
+            patch("financial_datasets.generator.TokenTextSplitter") as token_splitter, \
+            patch("financial_datasets.generator.chat_completion_request", return_value=stub_response([])):
+        token_splitter.return_value.split_text.side_effect = lambda text: [text]
+        generator.generate_from_10Q(ticker="TSLA", year=2023, quarter=4, include_financials=True, request_interval=0)
+
+    # Then
+    assert get_10Q_filing.call_count == 1
+    get_items.assert_called_once_with(filing, [])
+    get_financials.assert_called_once_with(filing)
+
+
 def test_generate_from_10K():
     def create_openai_generator() -> DatasetGenerator:
         return DatasetGenerator(
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from financial_datasets.index import ChunkIndex, HashingEmbedder
+
+texts = [
+    "Our liquidity and capital resources consist of cash, cash equivalents and marketable securities, which we believe are sufficient to meet our working capital needs.",
+    "Revenue from the Automotive segment increased by 15% to $82.4 billion, driven by higher vehicle deliveries.",
+    "We are subject to legal proceedings and claims that arise in the ordinary course of business.",
+]
+
+
+def test_hashing_embedder():
+    # Given
+    embedder = HashingEmbedder(dim=64)
+
+    # When
+    embeddings = embedder.embed(texts)
+
+    # Then
+    assert embeddings.shape == (3, 64)
+    assert abs(float((embeddings[0] ** 2).sum()) - 1.0) < 1e-5
+
+
+def test_search(tmp_path):
+    # Given
+    index = ChunkIndex(str(tmp_path))
+    index.add(texts, source="TSLA 10-K 2023")
+
+    # When
+    results = index.search("liquidity and capital resources", top_k=2)
+
+    # Then
+    assert len(results) == 2
+    assert results[0][0] == texts[0]
+    assert results[0][1] >= results[1][1]
+
+
+def test_add_skips_cached_chunks_and_persists(tmp_path):
+    # Given
+    index = ChunkIndex(str(tmp_path))
+    index.add(texts, source="TSLA 10-K 2023")
+
+    # When
+    num_added = index.add(texts[:1] + ["Segment revenue for Energy Generation and Storage grew 54%."], source="TSLA 10-Q 2024 Q1")
+    reopened = ChunkIndex(str(tmp_path))
+
+    # Then
+    assert num_added == 1
+    assert len(reopened) == 4
+    assert reopened.sources == ["TSLA 10-K 2023", "TSLA 10-Q 2024 Q1"]
+
+
+def test_search_with_ann(tmp_path):
+    # Given
+    index = ChunkIndex(str(tmp_path))
+    index.add(texts, source="TSLA 10-K 2023")
+    index.build_ann(num_lists=2)
+    index.add(["Automotive segment revenue and gross margin by quarter."], source="TSLA 10-Q 2024 Q1")
+
+    # When
+    results = index.search("Automotive segment revenue", top_k=1, num_probes=2)
+
+    # Then
+    assert index.has_ann
+    assert len(results) == 1
+    assert "Automotive segment" in results[0][0]
+
+
+def test_add_can_be_retried_after_failure(tmp_path):
+    # Given
+    class FailingEmbedder(HashingEmbedder):
+        fail = True
+
+        def embed(self, texts):
+            if self.fail:
+                raise RuntimeError("Embedding failed")
+            return super().embed(texts)
+
+    embedder = FailingEmbedder()
+    index = ChunkIndex(str(tmp_path), embedder=embedder)
+    with pytest.raises(RuntimeError):
+        index.add(texts, source="TSLA 10-K 2023")
+
+    # When
+    embedder.fail = False
+    num_added = index.add(texts, source="TSLA 10-K 2023")
+
+    # Then
+    assert num_added == 3
+    assert len(index) == 3
+
+
+def test_add_can_be_retried_after_failed_chunks_write(tmp_path, monkeypatch):
+    # Given
+    index = ChunkIndex(str(tmp_path))
+    index.add(texts[:1], source="TSLA 10-K 2023")
+
+    # Fail after the embeddings and the first chunk have been written
+    dumps = json.dumps
+    calls = []
+
+    def failing_dumps(obj):
+        calls.append(obj)
+        if len(calls) == 2:
+            raise OSError("Disk full")
+        return dumps(obj)
+
+    monkeypatch.setattr("financial_datasets.index.json.dumps", failing_dumps)
+    with pytest.raises(OSError):
+        index.add(texts[1:], source="TSLA 10-K 2023")
+    monkeypatch.undo()
+
+    # When
+    index.add(texts[1:], source="TSLA 10-K 2023")
+    index.add(["gamma energy storage deployments"], source="TSLA 10-Q 2024 Q1")
+
+    # Then
+    for current in [index, ChunkIndex(str(tmp_path))]:
+        assert len(current) == len(texts) + 1
+        top_text, top_score = current.search("gamma energy storage deployments", top_k=1)[0]
+        assert top_text == "gamma energy storage deployments"
+        assert top_score == pytest.approx(1.0)
@@ -1,3 +1,7 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from financial_datasets import parser as parser_module
 from financial_datasets.parser import FilingParser
 
 
@@ -65,3 +69,40 @@ def test_get_10Q_items_with_items_param():
     assert len(items) == 2
     assert items[0].startswith("ITEM 1A")
     assert items[1].startswith("ITEM 2")
+
+
+def test_get_10K_financials():
+    # Given
+    parser = FilingParser()
+
+    # When
+    financials = parser.get_10K_financials(
+        ticker="SNOW",
+        year=2023,
+    )
+
+    # Then
+    assert financials.form == "10-K"
+    assert not financials.facts.empty
+    assert not financials.statements["income_statement"].empty
+
+
+def test_get_financials_cache_is_bounded(monkeypatch):
+    # Given
+    monkeypatch.setattr(parser_module, "financials_cache", parser_module.OrderedDict())
+    parser = FilingParser()
+    filings = [
+        SimpleNamespace(accession_number=f"0000000000-24-{i:06d}", form="10-K", xbrl=lambda: object())
+        for i in range(parser_module.financials_cache_size + 2)
+    ]
+
+    # When
+    with patch("financial_datasets.parser.FilingFinancials.from_xbrl", side_effect=lambda xbrl, form: object()) as from_xbrl:
+        for filing in filings:
+            parser.get_financials(filing)
+        parser.get_financials(filings[-1])
+
+    # Then
+    assert len(parser_module.financials_cache) == parser_module.financials_cache_size
+    assert filings[0].accession_number not in parser_module.financials_cache
+    assert from_xbrl.call_count == len(filings)
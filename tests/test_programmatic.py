@@ -0,0 +1,104 @@
+import pandas as pd
+
+from financial_datasets.dataset import Dataset, DatasetItem
+from financial_datasets.financials import FilingFinancials
+from financial_datasets.programmatic import format_amount, generate_from_financials
+from financial_datasets.verifier import verify_dataset
+
+
+def test_generate_from_financials(financials):
+    # When
+    dataset = generate_from_financials(financials)
+    questions = {item.question: item for item in dataset.items}
+
+    # Then
+    revenue = questions["What was Tesla, Inc.'s revenue for the fiscal year ended December 31, 2023?"]
+    assert revenue.answer == "$96.77 billion"
+
+    change = questions["By what percentage did Tesla, Inc.'s revenue increase for the fiscal year ended December 31, 2023 compared to the prior period?"]
+    assert change.answer == "18.8%"
+    assert "Revenue | 96,773,000,000 | 81,462,000,000 | 53,823,000,000" in change.context
+
+    assert "What was Tesla, Inc.'s total assets as of December 31, 2023?" in questions
+
+
+def test_generate_from_financials_with_max_questions(financials):
+    # When
+    dataset = generate_from_financials(financials, max_questions=5)
+
+    # Then
+    assert len(dataset.items) == 5
+
+
+def test_mix_with_llm_items(financials):
+    # Given
+    llm_dataset = Dataset(items=[DatasetItem(question="Question 1", answer="Answer 1", context="Context 1")])
+
+    # When
+    dataset = Dataset(items=llm_dataset.items + generate_from_financials(financials, max_questions=2).items)
+
+    # Then
+    assert len(dataset.items) == 3
+
+
+def test_generated_items_verify_against_to_texts(financials):
+    # Given
+    dataset = generate_from_financials(financials)
+
+    # When
+    results = verify_dataset(dataset, financials.to_texts())
+
+    # Then
+    # Values are found in the statements, and percentage changes derived from them are not rejected
+    for item, result in zip(dataset.items, results):
+        if item.answer.endswith("%"):
+            assert result.status in ("pass", "ambiguous")
+        else:
+            assert result.status == "pass"
+
+
+def test_format_amount():
+    assert format_amount(-15584000000, "USD") == "-$15.58 billion"
+    assert format_amount(4.3, "USD per shares") == "$4.30 per share"
+    assert format_amount(3174000000, "shares") == "3.17 billion shares"
+    assert format_amount(1234, None) == "1,234"
+
+
+def test_generate_from_financials_skips_duplicate_questions(financials):
+    # When
+    dataset = generate_from_financials(financials)
+    questions = [item.question for item in dataset.items]
+
+    # Then
+    assert len(questions) == len(set(questions))
+
+
+def test_generate_from_10Q_financials_states_duration():
+    # Given
+    facts = pd.DataFrame({
+        "fact": ["Revenues", "Revenues", "Revenues", "Revenues", "CostOfRevenue", "CostOfRevenue"],
+        "value": [23350000000.0, 71606000000.0, 21454000000.0, 57144000000.0, 19172000000.0, 19172000000.0],
+        "units": ["USD"] * 6,
+        "start_date": pd.to_datetime(["2023-07-01", "2023-01-01", "2022-07-01", "2022-01-01", "2023-07-01", "2023-01-01"]),
+        "end_date": pd.to_datetime(["2023-09-30", "2023-09-30", "2022-09-30", "2022-09-30", "2023-09-30", "2023-09-30"]),
+    })
+    income_statement = pd.DataFrame(
+        {
+            "label": ["Revenue", "Cost of Revenue"],
+            "units": ["USD", "USD"],
+            "2023-09-30": [23350000000.0, 19172000000.0],
+            "2022-09-30": [57144000000.0, None],
+        },
+        index=pd.Index(["Revenues", "CostOfRevenue"], name="fact"),
+    )
+    financials = FilingFinancials("Tesla, Inc.", "10-Q", facts, {"income_statement": income_statement})
+
+    # When
+    dataset = generate_from_financials(financials)
+    questions = [item.question for item in dataset.items]
+
+    # Then
+    assert questions == [
+        "What was Tesla, Inc.'s revenue for the three months ended September 30, 2023?",
+        "What was Tesla, Inc.'s revenue for the nine months ended September 30, 2022?",
+    ]
@@ -0,0 +1,77 @@
+from financial_datasets.scheduler import ChunkScheduler, allocate_questions, score_text
+
+boilerplate = "We are committed to our mission and our people, and we believe that our culture is a competitive advantage. " * 5
+numeric = "In 2023, revenue increased by 18% to $9.9 billion compared to 2022, primarily due to a 14% increase in Nights and Experiences Booked of 54.5 million combined with higher average daily rates driving a 16% increase in Gross Booking Value of $10.0 billion."
+
+
+def test_score_text():
+    # Given
+    texts = [boilerplate, numeric, "", " --- ... +++ "]
+
+    # When
+    scores = [score_text(text) for text in texts]
+
+    # Then
+    assert scores[1] > scores[0] > 0
+    assert scores[2] == 0
+    assert scores[3] == 0
+
+
+def test_allocate_questions():
+    # When
+    quotas = allocate_questions([1.0, 3.0, 0.0], max_questions=10)
+
+    # Then
+    assert sum(quotas) == 10
+    assert quotas[1] > quotas[0]
+    assert quotas[2] == 0
+
+
+def test_allocate_questions_with_more_texts_than_questions():
+    # When
+    quotas = allocate_questions([1.0] * 8 + [2.0, 2.0], max_questions=2)
+
+    # Then
+    assert quotas == [0] * 8 + [1, 1]
+
+
+def test_scheduler_dispatches_best_texts_first():
+    # Given
+    scheduler = ChunkScheduler([boilerplate, numeric, ""], max_questions=4)
+
+    # When
+    dispatched = []
+    for index, num_questions in scheduler:
+        dispatched.append(index)
+        scheduler.record(num_questions)
+
+    # Then
+    assert dispatched == [1, 0]
+
+
+def test_scheduler_reallocates_shortfall():
+    # Given
+    scheduler = ChunkScheduler([numeric, numeric, numeric], max_questions=6)
+
+    # When
+    requested = []
+    for index, num_questions in scheduler:
+        requested.append(num_questions)
+        # The first text under-delivers, the others deliver what they were asked for
+        scheduler.record(0 if not requested[:-1] else num_questions)
+
+    # Then
+    assert requested[0] == 2
+    assert sum(requested[1:]) == 6
+
+
+def test_scheduler_weights_scores():
+    # Given
+    scheduler = ChunkScheduler([numeric, boilerplate, numeric], max_questions=4, weights=[0.1, 1.0, 0.0])
+
+    # When
+    dispatched = [index for index, _ in scheduler]
+
+    # Then
+    assert dispatched == [1, 0]
+    assert scheduler.scores[2] == 0
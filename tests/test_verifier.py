@@ -0,0 +1,117 @@
+from financial_datasets.dataset import Dataset, DatasetItem
+from financial_datasets.verifier import NgramIndex, extract_numbers, verify_dataset, verify_item
+
+texts = [
+    "Our business depends on Hosts maintaining their listings on our platform and engaging in practices that encourage guests to book those listings.",
+    "In 2023, revenue increased by 18% to $9.9 billion compared to 2022, primarily due to a 14% increase in Nights and Experiences Booked of 54.5 million combined with higher average daily rates.",
+]
+
+grounded = DatasetItem(
+    question="What was Airbnb's revenue in 2023?",
+    answer="$9.9 billion",
+    context="In 2023, revenue increased by 18% to $9.9 billion compared to 2022.",
+)
+wrong_number = DatasetItem(
+    question="What was Airbnb's revenue in 2023?",
+    answer="$10.4 billion",
+    context="In 2023, revenue increased by 18% to $9.9 billion compared to 2022.",
+)
+number_only_in_context = DatasetItem(
+    question="What was Airbnb's free cash flow in 2023?",
+    answer="$12.4 billion",
+    context="In 2023, revenue increased by 18% to $9.9 billion compared to 2022, and free cash flow was $12.4 billion.",
+)
+fabricated = DatasetItem(
+    question="How many employees did Airbnb have in 2023?",
+    answer="6,907",
+    context="As of December 31, 2023, we had 6,907 employees located in 30 countries.",
+)
+
+
+def test_extract_numbers():
+    assert extract_numbers("Revenue of $9.9 billion, up 18%, and 6,907 employees") == {9.9e9, 18.0, 6907.0}
+    assert extract_numbers("$9,900 million") == extract_numbers("9,900,000,000") == {9.9e9}
+
+
+def test_match():
+    # Given
+    index = NgramIndex(texts)
+
+    # When
+    source_index, score = index.match("revenue increased by 18% to $9.9 billion")
+
+    # Then
+    assert source_index == 1
+    assert score == 1.0
+
+
+def test_verify_dataset():
+    # When
+    results = verify_dataset(Dataset(items=[grounded, wrong_number, fabricated]), texts)
+
+    # Then
+    # A grounded context with an answer that is not in the source may be a derived figure, so it is left to a judge
+    assert [result.status for result in results] == ["pass", "ambiguous", "fail"]
+    assert results[0].passed
+    assert results[0].source_index == 1
+    assert results[1].context_score == 1.0
+    assert results[1].numeric_score == 0.0
+    assert results[2].context_score < 0.3
+
+
+def test_verify_dataset_with_source_indices():
+    # When
+    results = verify_dataset(Dataset(items=[grounded]), texts, source_indices=[0])
+
+    # Then
+    assert results[0].source_index == 0
+    assert results[0].status == "fail"
+
+
+def test_verify_dataset_with_workers():
+    # Given
+    dataset = Dataset(items=[grounded, wrong_number, fabricated] * 10)
+
+    # When
+    results = verify_dataset(dataset, texts, num_workers=2, batch_size=4)
+
+    # Then
+    assert [result.status for result in results] == ["pass", "ambiguous", "fail"] * 10
+
+
+def test_verify_dataset_ignores_numbers_only_in_context():
+    # When
+    results = verify_dataset(Dataset(items=[number_only_in_context]), texts)
+
+    # Then
+    assert results[0].source_index == 1
+    assert results[0].numeric_score == 0.0
+    assert results[0].status == "fail"
+
+
+def test_verify_item_normalizes_scale_and_rounding():
+    # Given
+    index = NgramIndex(["Revenue | 96,773,000,000 | 81,462,000,000", "Revenue was $9,900 million in 2023."])
+
+    # When
+    rounded = verify_item(index, context="Revenue | 96,773,000,000 | 81,462,000,000", answer="$96.77 billion")
+    rescaled = verify_item(index, context="Revenue was $9,900 million in 2023.", answer="$9.9 billion")
+    wrong = verify_item(index, context="Revenue | 96,773,000,000 | 81,462,000,000", answer="$96.9 billion")
+
+    # Then
+    assert rounded.numeric_score == 1.0
+    assert rescaled.numeric_score == 1.0
+    assert wrong.numeric_score == 0.0
+
+
+def test_verify_item_without_source():
+    # Given
+    index = NgramIndex(texts)
+
+    # When
+    result = verify_item(index, context="Free cash flow was $12.4 billion.", answer="$12.4 billion")
+
+    # Then
+    assert result.source_index is None
+    assert result.numeric_score == 0.0
+    assert result.status == "fail"